@@ -1,6 +1,6 @@
 import streamlit as st
 from utils.auth import initialize_auth_state, show_auth_page
-from utils.database import get_user_usage
+from utils.database import get_cached_user_usage
 
 st.set_page_config(
     page_title="Ai Prop IQ Analytics",
@@ -9,6 +9,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Static overview of the app's pages, built once at import time
+FEATURES = [
+    ("🏠 Property Search", ["Search properties by address", "Get detailed property information", "View market analytics"]),
+    ("📊 Usage Dashboard", ["Track your API usage", "View query history", "Monitor account limits"]),
+    ("👤 Profile Management", ["Update account settings", "Change password", "Manage preferences"]),
+]
+FEATURES_HTML = (
+    '<div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 1rem;">'
+    + "".join(
+        f'<div><h3>{title}</h3><ul>{"".join(f"<li>{item}</li>" for item in items)}</ul></div>'
+        for title, items in FEATURES
+    )
+    + "</div>"
+)
+
 # Initialize authentication state
 initialize_auth_state()
 
@@ -30,7 +45,7 @@ else:
     
     with col2:
         try:
-            queries_used = get_user_usage(user_id, user_email)
+            queries_used = get_cached_user_usage(user_id, user_email)
         except Exception as e:
             st.error(f"Error fetching usage: {e}")
             queries_used = 0
@@ -45,31 +60,7 @@ else:
     # App overview
     st.subheader("📋 Available Features")
     
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        ### 🏠 Property Search
-        - Search properties by address
-        - Get detailed property information
-        - View market analytics
-        """)
-    
-    with col2:
-        st.markdown("""
-        ### 📊 Usage Dashboard
-        - Track your API usage
-        - View query history
-        - Monitor account limits
-        """)
-    
-    with col3:
-        st.markdown("""
-        ### 👤 Profile Management
-        - Update account settings
-        - Change password
-        - Manage preferences
-        """)
+    st.markdown(FEATURES_HTML, unsafe_allow_html=True)
     
     st.markdown("---")
     st.info("💡 Use the sidebar navigation to access different features of the application.")
@@ -3,19 +3,24 @@
 # =====================================================
 
 import streamlit as st
+import html
 import json
+import orjson
 import logging
+import reprlib
+import threading
+import time
+import traceback
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from utils.auth import initialize_auth_state
 from utils.rentcast_api import fetch_property_details
-from utils.database import get_user_usage
-from streamlit.components.v1 import html
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from utils.database import get_cached_user_usage
 import os
 
-# Set up logging
+# Set up logging (basicConfig is a no-op once the root logger has a handler, so reruns add nothing;
+# without it the page's INFO records would only reach logging.lastResort, which drops them)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -25,48 +30,125 @@ st.set_page_config(page_title="Property Search", page_icon="🏠", layout="wide"
 # 1. Database Connection & Functions
 # =====================================================
 
+# Pool size, how long a session waits for a free connection, and how long a connection
+# may sit idle before it is pinged on the next borrow
+DB_POOL_MAX = 10
+DB_POOL_WAIT_TIMEOUT = 30
+DB_IDLE_CHECK_SECONDS = 60
+
+@st.cache_resource(show_spinner=False)
+def get_db_pool():
+    """Create the shared connection pool using Supabase credentials (once per process)"""
+    from psycopg2.pool import ThreadedConnectionPool
+    
+    # Replace these with your actual Supabase database credentials.
+    # psycopg2 never uses server-side prepared statements, so this also works
+    # against Supabase's transaction-mode pooler (port 6543).
+    # Errors propagate so a failed connect is not cached; get_db_connection reports them.
+    pool = ThreadedConnectionPool(
+        1, DB_POOL_MAX,
+        host=os.getenv("SUPABASE_DB_HOST"),
+        database=os.getenv("SUPABASE_DB_NAME"),
+        user=os.getenv("SUPABASE_DB_USER"),
+        password=os.getenv("SUPABASE_DB_PASSWORD"),
+        port=os.getenv("SUPABASE_DB_PORT", "5432"),
+        connect_timeout=10
+    )
+    # ThreadedConnectionPool raises PoolError when exhausted; borrowers wait on this instead
+    pool.slots = threading.BoundedSemaphore(DB_POOL_MAX)
+    # id(conn) -> time.monotonic() when it was last returned to the pool
+    pool.last_used = {}
+    return pool
+
+def borrow_live_connection(pool):
+    """Take a connection from the pool, skipping any the server has already closed"""
+    while True:
+        conn = pool.getconn()
+        last_used = pool.last_used.pop(id(conn), None)
+        if not conn.closed:
+            # Fresh and recently used connections are trusted; only long-idle ones pay for a ping
+            if last_used is None or time.monotonic() - last_used < DB_IDLE_CHECK_SECONDS:
+                return conn
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                return conn
+            except Exception as e:
+                logger.warning(f"Discarding stale pooled connection: {e}")
+        # Discard it and try the next idle connection; once those run out the pool opens a new one
+        pool.putconn(conn, close=True)
+
+@contextmanager
 def get_db_connection():
-    """Get database connection using Supabase credentials"""
+    """Borrow a pooled connection; yields None if the database is unavailable"""
     try:
-        # Replace these with your actual Supabase database credentials
-        conn = psycopg2.connect(
-            host=os.getenv("SUPABASE_DB_HOST"),
-            database=os.getenv("SUPABASE_DB_NAME"),
-            user=os.getenv("SUPABASE_DB_USER"),
-            password=os.getenv("SUPABASE_DB_PASSWORD"),
-            port=os.getenv("SUPABASE_DB_PORT", "5432")
-        )
-        return conn
+        pool = get_db_pool()
     except Exception as e:
         logger.error(f"Database connection error: {e}")
-        return None
-
-def save_property_search(user_id: str, property_data: Dict[Any, Any]) -> bool:
-    """Save property search to database"""
+        yield None
+        return
+    
+    if not pool.slots.acquire(timeout=DB_POOL_WAIT_TIMEOUT):
+        logger.error("Database connection error: no pooled connection became free")
+        yield None
+        return
+    
     try:
-        conn = get_db_connection()
-        if not conn:
-            return False
-            
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO property_searches (user_id, property_data, search_date)
-                VALUES (%s, %s, %s)
-            """, (user_id, json.dumps(property_data), datetime.now()))
-            conn.commit()
+        conn = borrow_live_connection(pool)
+    except Exception as e:
+        pool.slots.release()
+        logger.error(f"Database connection error: {e}")
+        yield None
+        return
+    
+    try:
+        yield conn
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception as rollback_error:
+            logger.warning(f"Rollback failed: {rollback_error}")
+        raise
+    finally:
+        if not conn.closed:
+            pool.last_used[id(conn)] = time.monotonic()
+        pool.putconn(conn, close=bool(conn.closed))
+        pool.slots.release()
+
+def save_property_search(user_id: str, property_data: Dict[Any, Any]) -> Optional[int]:
+    """Save property search to database, returning the new search id (None on failure)"""
+    try:
+        with get_db_connection() as conn:
+            if not conn:
+                return None
+                
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO property_searches (user_id, property_data, search_date)
+                    VALUES (%s, %s, %s)
+                    RETURNING id
+                """, (user_id, orjson.dumps(property_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode(), datetime.now()))
+                search_id = cur.fetchone()[0]
+                conn.commit()
         
-        conn.close()
-        return True
+        fetch_search_statistics.clear(user_id)
+        fetch_user_property_searches.clear(user_id)
+        return search_id
     except Exception as e:
         logger.error(f"Error saving property search: {e}")
-        return False
+        return None
 
-def get_user_property_searches(user_id: str, limit: int = 50) -> List[Dict]:
-    """Get user's property search history"""
-    try:
-        conn = get_db_connection()
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_user_property_searches(user_id: str, limit: int = 50) -> List[Dict]:
+    """Query user's property search history (cached for a minute; cleared on save/delete).
+
+    Failures raise rather than return a fallback, so they are never cached.
+    """
+    from psycopg2.extras import RealDictCursor
+    
+    with get_db_connection() as conn:
         if not conn:
-            return []
+            raise ConnectionError("Database unavailable")
             
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("""
@@ -77,9 +159,31 @@ def get_user_property_searches(user_id: str, limit: int = 50) -> List[Dict]:
                 LIMIT %s
             """, (user_id, limit))
             results = cur.fetchall()
-        
-        conn.close()
-        return [dict(row) for row in results]
+        conn.commit()
+    
+    # Display and filter fields are derived once per fetch (the list is cached), not on every rerun
+    searches = []
+    for row in results:
+        search = dict(row)
+        property_data = search['property_data']
+        search['address'] = get_address(property_data, 'Unknown Address')
+        search['address_lower'] = str(get_address(property_data, '')).lower()
+        search['search_date_label'] = search['search_date'].strftime("%B %d, %Y at %I:%M %p")
+        search['summary_html'] = HISTORY_SUMMARY_TEMPLATE.format(
+            property_type=html_text(safe_get(property_data, 'propertyType')),
+            bedrooms=html_text(safe_get(property_data, 'bedrooms')),
+            bathrooms=html_text(safe_get(property_data, 'bathrooms')),
+            estimated_value=format_currency(safe_get(property_data, 'estimatedValue')),
+            search_date=search['search_date_label'],
+        )
+        searches.append(search)
+    return searches
+
+def get_user_property_searches(user_id: str) -> List[Dict]:
+    """Get user's property search history; [] (uncached) if the database is unavailable"""
+    try:
+        # Called with user_id alone, matching the fetch_user_property_searches.clear(user_id) calls
+        return fetch_user_property_searches(user_id)
     except Exception as e:
         logger.error(f"Error fetching property searches: {e}")
         return []
@@ -87,42 +191,48 @@ def get_user_property_searches(user_id: str, limit: int = 50) -> List[Dict]:
 def delete_property_search(search_id: int, user_id: str) -> bool:
     """Delete a specific property search"""
     try:
-        conn = get_db_connection()
-        if not conn:
-            return False
-            
-        with conn.cursor() as cur:
-            cur.execute("""
-                DELETE FROM property_searches 
-                WHERE id = %s AND user_id = %s
-            """, (search_id, user_id))
-            conn.commit()
+        with get_db_connection() as conn:
+            if not conn:
+                return False
+                
+            with conn.cursor() as cur:
+                cur.execute("""
+                    DELETE FROM property_searches 
+                    WHERE id = %s AND user_id = %s
+                """, (search_id, user_id))
+                conn.commit()
         
-        conn.close()
+        fetch_search_statistics.clear(user_id)
+        fetch_user_property_searches.clear(user_id)
         return True
     except Exception as e:
         logger.error(f"Error deleting property search: {e}")
         return False
 
-def get_search_statistics(user_id: str) -> Dict[str, Any]:
-    """Get user's search statistics"""
-    try:
-        conn = get_db_connection()
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_search_statistics(user_id: str) -> Dict[str, Any]:
+    """Query user's search statistics (cached for a minute; cleared on save/delete).
+
+    Failures raise rather than return a fallback, so they are never cached.
+    """
+    from psycopg2.extras import RealDictCursor
+    
+    with get_db_connection() as conn:
         if not conn:
-            return {}
-            
+            raise ConnectionError("Database unavailable")
+                
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Total searches
-            cur.execute("SELECT COUNT(*) as total FROM property_searches WHERE user_id = %s", (user_id,))
-            total_searches = cur.fetchone()['total']
-            
-            # Recent searches (last 30 days)
+            # Total and recent (last 30 days) searches in one scan
             cur.execute("""
-                SELECT COUNT(*) as recent 
+                SELECT 
+                    COUNT(*) as total,
+                    COUNT(*) FILTER (WHERE search_date >= %s) as recent
                 FROM property_searches 
-                WHERE user_id = %s AND search_date >= %s
-            """, (user_id, datetime.now() - timedelta(days=30)))
-            recent_searches = cur.fetchone()['recent']
+                WHERE user_id = %s
+            """, (datetime.now() - timedelta(days=30), user_id))
+            counts = cur.fetchone()
+            total_searches = counts['total']
+            recent_searches = counts['recent']
             
             # Most searched property types
             cur.execute("""
@@ -137,13 +247,18 @@ def get_search_statistics(user_id: str) -> Dict[str, Any]:
                 LIMIT 5
             """, (user_id,))
             property_types = cur.fetchall()
-        
-        conn.close()
-        return {
-            'total_searches': total_searches,
-            'recent_searches': recent_searches,
-            'top_property_types': [dict(row) for row in property_types]
-        }
+        conn.commit()
+    
+    return {
+        'total_searches': total_searches,
+        'recent_searches': recent_searches,
+        'top_property_types': [dict(row) for row in property_types]
+    }
+
+def get_search_statistics(user_id: str) -> Dict[str, Any]:
+    """Get user's search statistics; {} (uncached) if the database is unavailable"""
+    try:
+        return fetch_search_statistics(user_id)
     except Exception as e:
         logger.error(f"Error getting search statistics: {e}")
         return {}
@@ -165,7 +280,7 @@ user_id = st.session_state.user.id
 # =====================================================
 with st.sidebar:
     st.subheader("👤 Account Info")
-    queries_used = get_user_usage(user_id, user_email)
+    queries_used = get_cached_user_usage(user_id, user_email)
     
     st.metric("Email", user_email)
     st.metric("Queries Used", f"{queries_used}/30")
@@ -178,14 +293,16 @@ with st.sidebar:
     # Search Statistics
     st.subheader("📊 Search Statistics")
     stats = get_search_statistics(user_id)
+    # get_search_statistics returns either {} or a dict with every key, so plain indexing is safe
     if stats:
-        st.metric("Total Searches", stats.get('total_searches', 0))
-        st.metric("Last 30 Days", stats.get('recent_searches', 0))
+        st.metric("Total Searches", stats['total_searches'])
+        st.metric("Last 30 Days", stats['recent_searches'])
         
-        if stats.get('top_property_types'):
+        top_property_types = stats['top_property_types']
+        if top_property_types:
             st.subheader("🏠 Top Property Types")
-            for prop_type in stats['top_property_types']:
-                st.text(f"{prop_type['property_type']}: {prop_type['count']}")
+            # One text element for the whole list rather than one per row
+            st.text("\n".join(f"{prop_type['property_type']}: {prop_type['count']}" for prop_type in top_property_types))
 
 # =====================================================
 # 4. Tab Layout
@@ -197,22 +314,44 @@ tab1, tab2 = st.tabs(["🔍 New Search", "📚 Search History"])
 # =====================================================
 def safe_get(data, key, default="N/A"):
     """Safely get a value from dict with default fallback"""
-    try:
-        value = data.get(key, default)
-        return value if value is not None and value != "" else default
-    except (AttributeError, TypeError):
+    if not isinstance(data, dict):
         return default
+    value = data.get(key, default)
+    return value if value is not None and value != "" else default
+
+def html_text(value) -> str:
+    """Escape an API-derived value for interpolation into card HTML"""
+    return html.escape(str(value))
+
+# Bounded repr for previews of raw API payloads: nested containers are elided rather than fully stringified
+_PREVIEW_REPR = reprlib.Repr()
+_PREVIEW_REPR.maxlevel = 4
+_PREVIEW_REPR.maxdict = _PREVIEW_REPR.maxlist = 10
+_PREVIEW_REPR.maxstring = _PREVIEW_REPR.maxother = 200
+
+def preview_text(value, limit):
+    """Return at most limit characters of value's text form without stringifying all of it"""
+    if isinstance(value, (str, bytes)):
+        # Slice before converting, so a multi-MB body is never copied whole
+        return str(value[:limit])[:limit]
+    return _PREVIEW_REPR.repr(value)[:limit]
+
+def get_address(data, default="N/A"):
+    """Return formattedAddress, falling back to address only when it is missing"""
+    address = safe_get(data, 'formattedAddress', None)
+    return address if address is not None else safe_get(data, 'address', default)
 
 def format_currency(value):
     """Format currency values safely"""
-    try:
-        if isinstance(value, (int, float)) and value > 0:
-            return f"${value:,.0f}"
-        elif isinstance(value, str) and value.replace(',', '').replace('$', '').isdigit():
-            return f"${int(value.replace(',', '').replace('$', '')):,}"
-        return "N/A"
-    except (ValueError, TypeError):
-        return "N/A"
+    if isinstance(value, (int, float)) and value > 0:
+        return f"${value:,.0f}"
+    elif isinstance(value, str):
+        # Two str.replace calls beat a regex sub for stripping the "$" and "," characters
+        digits = value.replace(',', '').replace('$', '')
+        # isdecimal (unlike isdigit) only admits characters int() accepts
+        if digits.isdecimal():
+            return f"${int(digits):,}"
+    return "N/A"
 
 def build_card(title: str, content: str) -> str:
     """Build HTML card component"""
@@ -232,153 +371,348 @@ def build_compact_card(title: str, content: str, card_id: str = "") -> str:
     </div>
     """
 
+# Wrapper keys that hold the property list, checked in order
+PROPERTY_CONTAINER_KEYS = ("properties", "data")
+
+# A bare dict holding any of these keys is treated as a single property record
+PROPERTY_MARKER_KEYS = frozenset(("formattedAddress", "propertyType", "bedrooms", "id"))
+
 def process_property_data(raw_data):
     """Process and validate property data from API response"""
-    try:
-        logger.info(f"Raw API response type: {type(raw_data)}")
-        logger.info(f"Raw API response: {str(raw_data)[:500]}...")
-        
-        if isinstance(raw_data, str):
-            try:
-                property_data = json.loads(raw_data)
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {e}")
-                return None
-        elif isinstance(raw_data, (dict, list)):
-            property_data = raw_data
-        else:
-            logger.error(f"Unexpected data type: {type(raw_data)}")
-            return None
-        
-        if not property_data:
-            logger.error("Empty property data received")
+    logger.info(f"Raw API response type: {type(raw_data)}")
+    logger.info(f"Raw API response: {preview_text(raw_data, 500)}...")
+    
+    if isinstance(raw_data, (str, bytes)):
+        try:
+            # orjson parses str and raw HTTP bytes directly, without an extra decode
+            property_data = orjson.loads(raw_data)
+        except orjson.JSONDecodeError as e:
+            logger.error(f"JSON decode error: {e}")
             return None
-            
-        properties = None
-        
-        if isinstance(property_data, list) and len(property_data) > 0:
-            properties = property_data
-        elif isinstance(property_data, dict) and "properties" in property_data:
-            properties = property_data["properties"]
-        elif isinstance(property_data, dict) and "data" in property_data:
-            properties = property_data["data"]
-        elif isinstance(property_data, dict) and any(key in property_data for key in ["formattedAddress", "propertyType", "bedrooms", "id"]):
-            properties = [property_data]
+    elif isinstance(raw_data, (dict, list)):
+        property_data = raw_data
+    else:
+        logger.error(f"Unexpected data type: {type(raw_data)}")
+        return None
+    
+    if not property_data:
+        logger.error("Empty property data received")
+        return None
         
-        if not properties or len(properties) == 0:
-            logger.error("No properties found in response")
-            return None
-            
-        first_property = properties[0]
-        logger.info(f"Successfully processed property: {first_property.get('formattedAddress', 'Unknown Address')}")
-        return first_property
+    properties = None
+    
+    if isinstance(property_data, list):
+        properties = property_data
+    elif isinstance(property_data, dict):
+        for key in PROPERTY_CONTAINER_KEYS:
+            if key in property_data:
+                properties = property_data[key]
+                break
+        else:
+            if not PROPERTY_MARKER_KEYS.isdisjoint(property_data):
+                properties = [property_data]
+    
+    if not properties or not isinstance(properties, list):
+        logger.error("No properties found in response")
+        return None
         
-    except Exception as e:
-        logger.error(f"Error processing property data: {e}")
+    first_property = properties[0]
+    if not isinstance(first_property, dict):
+        logger.error(f"Unexpected property record type: {type(first_property)}")
         return None
+    
+    logger.info(f"Successfully processed property: {first_property.get('formattedAddress', 'Unknown Address')}")
+    return first_property
 
 def render_property_cards(prop: Dict[Any, Any], compact: bool = False) -> str:
     """Render property information as HTML cards"""
-    cards_html = ""
+    # Cards and multi-line sections are collected as fragments and joined once
+    cards = []
     card_function = build_compact_card if compact else build_card
     
     # Basic Property Information
     basic_info = f"""
-    <b>Property Type:</b> {safe_get(prop, 'propertyType')}<br>
-    <b>Bedrooms:</b> {safe_get(prop, 'bedrooms')}<br>
-    <b>Bathrooms:</b> {safe_get(prop, 'bathrooms')}<br>
-    <b>Square Footage:</b> {safe_get(prop, 'squareFootage')} sq ft<br>
-    <b>Year Built:</b> {safe_get(prop, 'yearBuilt')}
+    <b>Property Type:</b> {html_text(safe_get(prop, 'propertyType'))}<br>
+    <b>Bedrooms:</b> {html_text(safe_get(prop, 'bedrooms'))}<br>
+    <b>Bathrooms:</b> {html_text(safe_get(prop, 'bathrooms'))}<br>
+    <b>Square Footage:</b> {html_text(safe_get(prop, 'squareFootage'))} sq ft<br>
+    <b>Year Built:</b> {html_text(safe_get(prop, 'yearBuilt'))}
     """
-    cards_html += card_function("🏠 Basic Information", basic_info)
+    cards.append(card_function("🏠 Basic Information", basic_info))
 
     # Address Information
     address_info = f"""
-    <b>Full Address:</b> {safe_get(prop, 'formattedAddress', safe_get(prop, 'address'))}<br>
-    <b>City:</b> {safe_get(prop, 'city')}<br>
-    <b>State:</b> {safe_get(prop, 'state')}<br>
-    <b>ZIP Code:</b> {safe_get(prop, 'zipCode')}
+    <b>Full Address:</b> {html_text(get_address(prop))}<br>
+    <b>City:</b> {html_text(safe_get(prop, 'city'))}<br>
+    <b>State:</b> {html_text(safe_get(prop, 'state'))}<br>
+    <b>ZIP Code:</b> {html_text(safe_get(prop, 'zipCode'))}
     """
-    cards_html += card_function("📍 Address", address_info)
+    cards.append(card_function("📍 Address", address_info))
 
     # Valuation Information
-    valuation_info = ""
+    valuation_info = []
     estimated_value = safe_get(prop, 'estimatedValue')
     if estimated_value != "N/A":
-        valuation_info += f"<b>Estimated Value:</b> {format_currency(estimated_value)}<br>"
+        valuation_info.append(f"<b>Estimated Value:</b> {format_currency(estimated_value)}<br>")
     
     market_value = safe_get(prop, 'marketValue')
     if market_value != "N/A":
-        valuation_info += f"<b>Market Value:</b> {format_currency(market_value)}<br>"
+        valuation_info.append(f"<b>Market Value:</b> {format_currency(market_value)}<br>")
     
     if valuation_info:
-        cards_html += card_function("💰 Property Valuation", valuation_info)
+        cards.append(card_function("💰 Property Valuation", "".join(valuation_info)))
 
     if not compact:
         # Additional detailed information for full view
         
         # Features & Amenities
-        features = safe_get(prop, 'features')
-        if features != "N/A" and isinstance(features, dict):
-            features_html = "<br>".join([
-                f"<b>{k.replace('_', ' ').title()}:</b> {v}" 
+        # Parsed JSON only produces plain dicts and lists, so exact type checks stand in for isinstance
+        features = prop.get('features')
+        if type(features) is dict:
+            features_html = "<br>".join(
+                f"<b>{html_text(k.replace('_', ' ').title())}:</b> {html_text(v)}" 
                 for k, v in features.items() if v
-            ])
+            )
             if features_html:
-                cards_html += card_function("🔧 Features & Amenities", features_html)
+                cards.append(card_function("🔧 Features & Amenities", features_html))
 
         # Property Taxes
-        property_taxes = safe_get(prop, 'propertyTaxes')
-        if property_taxes != "N/A" and isinstance(property_taxes, dict):
-            tax_html = ""
+        property_taxes = prop.get('propertyTaxes')
+        if type(property_taxes) is dict:
+            tax_html = []
             for year, tax_data in property_taxes.items():
-                if isinstance(tax_data, dict):
+                if type(tax_data) is dict:
                     total = format_currency(tax_data.get('total', 0))
-                    tax_html += f"<b>{year}:</b> {total}<br>"
+                    tax_html.append(f"<b>{html_text(year)}:</b> {total}<br>")
                 else:
-                    tax_html += f"<b>{year}:</b> {format_currency(tax_data)}<br>"
+                    tax_html.append(f"<b>{html_text(year)}:</b> {format_currency(tax_data)}<br>")
             
             if tax_html:
-                cards_html += card_function("🏛️ Property Taxes", tax_html)
-
-        # Sale History
-        history = safe_get(prop, 'history')
-        if history != "N/A" and isinstance(history, (dict, list)):
-            hist_html = ""
-            if isinstance(history, dict):
-                for event_key, event_data in history.items():
-                    if isinstance(event_data, dict):
-                        event_type = event_data.get('event', 'Sale')
-                        date = event_data.get('date', 'Unknown')
-                        price = format_currency(event_data.get('price', 0))
-                        hist_html += f"<b>{event_type}:</b> {date} - {price}<br>"
-            elif isinstance(history, list):
-                for event in history:
-                    if isinstance(event, dict):
-                        event_type = event.get('event', 'Sale')
-                        date = event.get('date', 'Unknown')
-                        price = format_currency(event.get('price', 0))
-                        hist_html += f"<b>{event_type}:</b> {date} - {price}<br>"
+                cards.append(card_function("🏛️ Property Taxes", "".join(tax_html)))
+
+        # Sale History (dict keyed by date or a plain list of events)
+        history = prop.get('history')
+        history_type = type(history)
+        if history_type is dict or history_type is list:
+            events = history.values() if history_type is dict else history
+            hist_html = []
+            for event in events:
+                if type(event) is dict:
+                    event_type = html_text(event.get('event', 'Sale'))
+                    date = html_text(event.get('date', 'Unknown'))
+                    price = format_currency(event.get('price', 0))
+                    hist_html.append(f"<b>{event_type}:</b> {date} - {price}<br>")
             
             if hist_html:
-                cards_html += card_function("📜 Sale History", hist_html)
+                cards.append(card_function("📜 Sale History", "".join(hist_html)))
 
         # Owner Information
-        owner = safe_get(prop, 'owner')
-        if owner != "N/A" and isinstance(owner, dict):
-            owner_html = ""
+        owner = prop.get('owner')
+        if type(owner) is dict:
             names = owner.get('names', [])
             if names:
-                owner_html += f"<b>Owner(s):</b> {', '.join(names)}<br>"
+                cards.append(card_function("👤 Owner Information", f"<b>Owner(s):</b> {', '.join(map(html_text, names))}<br>"))
+
+    return "".join(cards)
+
+def keep_search_error():
+    """Debug expander callback: keep the stored search error for the rerun it triggers"""
+    st.session_state.search_error_keep = True
+
+def toggle_state_flag(key: str):
+    """Flip a boolean session state flag (used as a button callback)"""
+    st.session_state[key] = not st.session_state.get(key, False)
+
+def search_json(search: Dict[str, Any]) -> bytes:
+    """Pretty-printed JSON bytes of a saved search's property data, serialized once per session"""
+    # Saved searches are immutable, so the database id is a safe cache key
+    cache = st.session_state.setdefault("search_json_cache", {})
+    search_id = search['id']
+    if search_id not in cache:
+        cache[search_id] = orjson.dumps(
+            search['property_data'], default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    return cache[search_id]
+
+# Compact card styles for the history view, emitted once per page run rather than with every card set
+COMPACT_CARDS_CSS = """
+<style>
+    .compact-container {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+        gap: 15px;
+        padding: 10px 0;
+        max-height: 400px;
+        overflow-y: auto;
+    }
+    .compact-card {
+        background: #f8f9fa;
+        padding: 16px;
+        border-radius: 8px;
+        border: 1px solid #dee2e6;
+    }
+    .compact-card h4 {
+        margin-top: 0;
+        margin-bottom: 12px;
+        color: #495057;
+        font-size: 16px;
+        font-weight: 600;
+        border-bottom: 1px solid #adb5bd;
+        padding-bottom: 6px;
+    }
+    .compact-content {
+        font-size: 13px;
+        line-height: 1.6;
+        color: #6c757d;
+    }
+    .compact-content b {
+        color: #495057;
+        font-weight: 600;
+    }
+</style>
+"""
+
+def search_cards_html(search: Dict[str, Any]) -> str:
+    """Compact property cards HTML for a saved search, built once per session ('' if none)"""
+    cache = st.session_state.setdefault("search_cards_cache", {})
+    search_id = search['id']
+    if search_id not in cache:
+        cards_html = render_property_cards(search['property_data'], compact=True)
+        cache[search_id] = f'<div class="compact-container">{cards_html}</div>' if cards_html else ""
+    return cache[search_id]
+
+# Read-only summary shown at the top of each history entry (filled in once per fetch, with escaped values)
+HISTORY_SUMMARY_TEMPLATE = (
+    "<div><b>Property Type:</b> {property_type}<br>"
+    "<b>Bedrooms:</b> {bedrooms} | <b>Bathrooms:</b> {bathrooms}<br>"
+    "<b>Estimated Value:</b> {estimated_value}<br>"
+    "<b>Search Date:</b> {search_date}</div>"
+)
+
+@st.fragment
+def render_search_history_entry(search: Dict[str, Any]):
+    """Render one search history entry; its buttons rerun only this entry"""
+    search_date = search['search_date_label']
+    address = search['address']
+    detail_key = f"show_details_{search['id']}"
+    
+    # Nothing inside the entry is built until its expander is opened (which reruns this entry)
+    entry = st.expander(f"🏠 {address} - {search_date}", key=f"history_entry_{search['id']}", on_change="rerun")
+    if not entry.open:
+        return
+    with entry:
+        # Quick summary: one prebuilt HTML element; only the actions below are real widgets
+        st.html(search['summary_html'])
+        
+        with st.container(horizontal=True):
+            # Show detailed view toggle
+            st.button(f"👁️ View Details", key=f"view_{search['id']}",
+                      on_click=toggle_state_flag, args=(detail_key,))
             
-            if owner_html:
-                cards_html += card_function("👤 Owner Information", owner_html)
-
-    return cards_html
+            if st.button(f"🗑️ Delete", key=f"delete_{search['id']}"):
+                if delete_property_search(search['id'], user_id):
+                    st.session_state.get("search_json_cache", {}).pop(search['id'], None)
+                    st.session_state.get("search_cards_cache", {}).pop(search['id'], None)
+                    st.success("✅ Search deleted!")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to delete search")
+        
+        # Show detailed property information if toggled
+        # The toggle callback has already run by now, so one read reflects the latest click
+        show_details = st.session_state.get(detail_key, False)
+        if show_details:
+            st.markdown("---")
+            
+            compact_html = search_cards_html(search)
+            if compact_html:
+                st.html(compact_html)
+            
+            # Export options
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button(f"📄 Export as JSON", key=f"export_json_{search['id']}"):
+                    st.download_button(
+                        label="⬇️ Download JSON",
+                        data=search_json(search),
+                        file_name=f"property_{address.replace(' ', '_').replace(',', '')}_{search_date.replace(' ', '_').replace(':', '')}.json",
+                        mime="application/json",
+                        key=f"download_json_{search['id']}"
+                    )
+            
+            with col2:
+                # Re-search button (to get updated data)
+                if st.button(f"🔄 Re-search Property", key=f"research_{search['id']}"):
+                    st.info(f"💡 Go to the 'New Search' tab and search for: {address}")
 
 # =====================================================
 # 6. NEW SEARCH TAB
 # =====================================================
+# Static stylesheet and grid wrapper for the New Search result cards; only the cards vary per search.
+# The cards render inline in the app page, so every rule is scoped to the wrapper class.
+PROPERTY_CARDS_HEAD = """
+<style>
+    .property-card-container {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
+        gap: 20px;
+        padding: 10px;
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        color: #2c3e50;
+    }
+    .property-card-container .card {
+        background: #ffffff;
+        padding: 24px;
+        border-radius: 12px;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+        transition: all 0.3s ease;
+        border: 1px solid #e9ecef;
+    }
+    .property-card-container .card:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
+    }
+    .property-card-container .card h3 {
+        margin-top: 0;
+        margin-bottom: 16px;
+        color: #2c3e50;
+        font-size: 20px;
+        font-weight: 600;
+        border-bottom: 2px solid #3498db;
+        padding-bottom: 8px;
+    }
+    .property-card-container .content {
+        font-size: 14px;
+        line-height: 1.8;
+        color: #495057;
+    }
+    .property-card-container .content b {
+        color: #2c3e50;
+        font-weight: 600;
+    }
+    .property-card-container pre {
+        white-space: pre-wrap;
+        word-wrap: break-word;
+        background: #f8f9fa;
+        padding: 16px;
+        border-radius: 8px;
+        font-size: 12px;
+        border: 1px solid #dee2e6;
+        max-height: 400px;
+        overflow-y: auto;
+    }
+    @media (max-width: 768px) {
+        .property-card-container {
+            grid-template-columns: 1fr;
+        }
+    }
+</style>
+<div class="property-card-container">
+"""
+PROPERTY_CARDS_TAIL = """
+</div>
+"""
+
 with tab1:
     st.title("🏠 Property Search")
     st.markdown("Retrieve detailed property information with a clean, card-based layout.")
@@ -390,128 +724,101 @@ with tab1:
     )
 
     if st.button("🔍 Search Property", type="primary", use_container_width=True):
+        st.session_state.pop("search_error", None)
         if not address:
             st.error("❌ Please enter a property address.")
         else:
-            with st.spinner("🔎 Fetching property data..."):
-                try:
+            try:
+                with st.status("🔎 Fetching property data...", expanded=True) as status:
                     # Fetch raw data from API
                     raw_response = fetch_property_details(address, user_id, user_email)
-                    
+
                     if not raw_response:
+                        status.update(label="⚠️ No response from API", state="error")
                         st.error("⚠️ No response from API. Please try again.")
                         st.stop()
-                    
-                    # Process the response
+
+                    # Process the response (intermediate steps are logged, not pushed to the UI)
+                    logger.debug("Processing property data for %s", address)
                     prop = process_property_data(raw_response)
-                    
+
                     if not prop:
+                        status.update(label="⚠️ No property data found", state="error")
                         st.error("⚠️ No property data found or invalid response format.")
-                        with st.expander("Debug: Raw API Response"):
-                            st.code(str(raw_response)[:2000] + "..." if len(str(raw_response)) > 2000 else str(raw_response))
+                        st.caption("Debug: Raw API Response")
+                        # One character past the limit tells whether the preview was cut
+                        preview = preview_text(raw_response, 2001)
+                        st.code(preview[:2000] + "..." if len(preview) > 2000 else preview)
                         st.stop()
 
-                    # Display success message
-                    property_address = safe_get(prop, 'formattedAddress', safe_get(prop, 'address', address))
-                    st.success(f"✅ Property found: {property_address}")
+                    property_address = get_address(prop, address)
 
                     # Save to database
-                    if save_property_search(user_id, prop):
-                        st.success("💾 Search saved to history!")
-                    else:
-                        st.warning("⚠️ Could not save search to history (search still completed)")
-
-                    # Build and render property cards
-                    cards_html = render_property_cards(prop, compact=False)
-                    
-                    # Add raw JSON data for debugging
-                    try:
-                        pretty_json = json.dumps(prop, indent=2, default=str)
-                        if len(pretty_json) > 5000:
-                            pretty_json = pretty_json[:5000] + "\n\n... (truncated)"
-                        cards_html += build_card("📋 Raw JSON Data", f"<pre>{pretty_json}</pre>")
-                    except Exception as e:
-                        cards_html += build_card("📋 Raw JSON Data", f"<pre>Error displaying JSON: {str(e)}</pre>")
-
-                    if not cards_html:
-                        st.warning("⚠️ No property information could be extracted from the response.")
-                    else:
-                        # Render final layout
-                        full_html = f"""
-                        <style>
-                            body {{
-                                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                                color: #2c3e50;
-                                background-color: #f8f9fa;
-                            }}
-                            .container {{
-                                display: grid;
-                                grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-                                gap: 20px;
-                                padding: 10px;
-                            }}
-                            .card {{
-                                background: #ffffff;
-                                padding: 24px;
-                                border-radius: 12px;
-                                box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-                                transition: all 0.3s ease;
-                                border: 1px solid #e9ecef;
-                            }}
-                            .card:hover {{
-                                transform: translateY(-2px);
-                                box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-                            }}
-                            .card h3 {{
-                                margin-top: 0;
-                                margin-bottom: 16px;
-                                color: #2c3e50;
-                                font-size: 20px;
-                                font-weight: 600;
-                                border-bottom: 2px solid #3498db;
-                                padding-bottom: 8px;
-                            }}
-                            .content {{
-                                font-size: 14px;
-                                line-height: 1.8;
-                                color: #495057;
-                            }}
-                            .content b {{
-                                color: #2c3e50;
-                                font-weight: 600;
-                            }}
-                            pre {{
-                                white-space: pre-wrap;
-                                word-wrap: break-word;
-                                background: #f8f9fa;
-                                padding: 16px;
-                                border-radius: 8px;
-                                font-size: 12px;
-                                border: 1px solid #dee2e6;
-                                max-height: 400px;
-                                overflow-y: auto;
-                            }}
-                            @media (max-width: 768px) {{
-                                .container {{
-                                    grid-template-columns: 1fr;
-                                }}
-                            }}
-                        </style>
-                        <div class="container">
-                            {cards_html}
-                        </div>
-                        """
-                        html(full_html, height=1200, scrolling=True)
+                    logger.debug("Saving property search for %s", property_address)
+                    saved_search_id = save_property_search(user_id, prop)
+                    status.update(label=f"✅ Property found: {property_address}", state="complete", expanded=False)
+
+                # Display success message
+                st.success(f"✅ Property found: {property_address}")
+                if saved_search_id:
+                    st.success("💾 Search saved to history!")
+                else:
+                    st.warning("⚠️ Could not save search to history (search still completed)")
 
+                # Build and render property cards
+                cards_html = render_property_cards(prop, compact=False)
+                
+                # Add raw JSON data for debugging
+                try:
+                    pretty_bytes = orjson.dumps(
+                        prop, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                    )
+                    # Decode only the part that is shown; "ignore" drops a character split by the cut
+                    # Escaped after truncation, so a cut can't leave a partial tag or entity behind
+                    pretty_json = html.escape(pretty_bytes[:5000].decode("utf-8", "ignore"))
+                    if len(pretty_bytes) > 5000:
+                        pretty_json += "\n\n... (truncated)"
+                    if saved_search_id:
+                        # The history entry's Export JSON downloads these same bytes instead of re-encoding
+                        st.session_state.setdefault("search_json_cache", {})[saved_search_id] = pretty_bytes
+                    cards_html += build_card("📋 Raw JSON Data", f"<pre>{pretty_json}</pre>")
                 except Exception as e:
-                    logger.error(f"Error in property search: {e}")
-                    st.error(f"❌ Error fetching property data: {str(e)}")
-                    
-                    with st.expander("🔍 Debug Information"):
-                        st.text(f"Error Type: {type(e).__name__}")
-                        st.text(f"Error Message: {str(e)}")
-                        import traceback
-                        st.code(traceback.format_exc())
+                    cards_html += build_card("📋 Raw JSON Data", f"<pre>Error displaying JSON: {str(e)}</pre>")
+
+                if not cards_html:
+                    st.warning("⚠️ No property information could be extracted from the response.")
+                else:
+                    # Render final layout
+                    full_html = PROPERTY_CARDS_HEAD + cards_html + PROPERTY_CARDS_TAIL
+                    # st.html renders inline (no iframe or fixed-height viewport) and skips markdown parsing
+                    st.html(full_html)
+
+            except Exception as e:
+                exc_message = str(e)
+                logger.error(f"Error in property search: {exc_message}")
+                st.error(f"❌ Error fetching property data: {exc_message}")
+                # Plain strings only: the exception's traceback would pin every frame's locals
+                st.session_state.search_error = {
+                    "type": type(e).__name__,
+                    "message": exc_message,
+                    "traceback": traceback.format_exc(),
+                }
+                st.session_state.search_error_keep = True
+
+    # The debug panel lives for the failing run and the reruns its own expander triggers;
+    # any other rerun (filters, history clicks, ...) drops the stored error
+    search_error = st.session_state.get("search_error")
+    if search_error is not None and not st.session_state.pop("search_error_keep", False):
+        del st.session_state["search_error"]
+        search_error = None
+    if search_error is not None:
+        debug_expander = st.expander("🔍 Debug Information", key="search_error_debug",
+                                     on_change=keep_search_error)
+        if debug_expander.open:
+            with debug_expander:
+                st.text(f"Error Type: {search_error['type']}")
+                st.text(f"Error Message: {search_error['message']}")
+                st.code(search_error['traceback'])
 
     # Tips section
     st.markdown("---")
@@ -528,9 +835,13 @@ with tab1:
 # =====================================================
 # 7. SEARCH HISTORY TAB
 # =====================================================
+# Date filter options and their look-back window in days (None = no cutoff)
+DATE_FILTER_DAYS = {"All time": None, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90}
+
 with tab2:
     st.title("📚 Property Search History")
     st.markdown("View and manage all your past property searches.")
+    st.html(COMPACT_CARDS_CSS)
 
     # Fetch search history
     search_history = get_user_property_searches(user_id)
@@ -545,22 +856,21 @@ with tab2:
             search_filter = st.text_input("🔍 Filter by address", placeholder="Type to filter...")
         
         with col2:
-            date_filter = st.selectbox(
-                "📅 Filter by date",
-                ["All time", "Last 7 days", "Last 30 days", "Last 90 days"]
-            )
+            date_filter = st.selectbox("📅 Filter by date", list(DATE_FILTER_DAYS))
         
         with col3:
             if st.button("🗑️ Clear All History", type="secondary"):
                 if st.session_state.get('confirm_clear_history'):
                     # Clear all history
                     try:
-                        conn = get_db_connection()
+                        with get_db_connection() as conn:
+                            if conn:
+                                with conn.cursor() as cur:
+                                    cur.execute("DELETE FROM property_searches WHERE user_id = %s", (user_id,))
+                                    conn.commit()
                         if conn:
-                            with conn.cursor() as cur:
-                                cur.execute("DELETE FROM property_searches WHERE user_id = %s", (user_id,))
-                                conn.commit()
-                            conn.close()
+                            fetch_search_statistics.clear(user_id)
+                            fetch_user_property_searches.clear(user_id)
                             st.success("✅ Search history cleared!")
                             st.rerun()
                     except Exception as e:
@@ -571,135 +881,45 @@ with tab2:
                     st.session_state.confirm_clear_history = True
                     st.warning("⚠️ Click again to confirm clearing all history")
 
-        # Apply filters
-        filtered_history = search_history.copy()
+        # Apply both filters in one pass; the cheap date comparison short-circuits before the
+        # address test, which checks the address itself before a text search of the whole record
+        filter_days = DATE_FILTER_DAYS[date_filter]
+        cutoff_date = datetime.now() - timedelta(days=filter_days) if filter_days is not None else None
+        filter_text = search_filter.lower()
         
-        # Date filter
-        if date_filter != "All time":
-            days_map = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90}
-            cutoff_date = datetime.now() - timedelta(days=days_map[date_filter])
-            filtered_history = [
-                search for search in filtered_history 
-                if search['search_date'] >= cutoff_date
-            ]
-        
-        # Address filter
-        if search_filter:
+        if cutoff_date is None and not filter_text:
+            filtered_history = search_history
+        else:
             filtered_history = [
-                search for search in filtered_history
-                if search_filter.lower() in json.dumps(search['property_data']).lower()
+                search for search in search_history
+                if (cutoff_date is None or search['search_date'] >= cutoff_date)
+                and (
+                    not filter_text
+                    or filter_text in search['address_lower']
+                    or filter_text in json.dumps(search['property_data']).lower()
+                )
             ]
 
         st.markdown(f"**Found {len(filtered_history)} searches**")
         
         # Display search history
-        for i, search in enumerate(filtered_history):
-            property_data = search['property_data']
-            search_date = search['search_date'].strftime("%B %d, %Y at %I:%M %p")
-            address = safe_get(property_data, 'formattedAddress', safe_get(property_data, 'address', 'Unknown Address'))
-            
-            with st.expander(f"🏠 {address} - {search_date}", expanded=False):
-                col1, col2 = st.columns([4, 1])
-                
-                with col1:
-                    # Quick summary
-                    property_type = safe_get(property_data, 'propertyType')
-                    bedrooms = safe_get(property_data, 'bedrooms')
-                    bathrooms = safe_get(property_data, 'bathrooms')
-                    estimated_value = safe_get(property_data, 'estimatedValue')
-                    
-                    st.markdown(f"""
-                    **Property Type:** {property_type}  
-                    **Bedrooms:** {bedrooms} | **Bathrooms:** {bathrooms}  
-                    **Estimated Value:** {format_currency(estimated_value)}  
-                    **Search Date:** {search_date}
-                    """)
-                
-                with col2:
-                    if st.button(f"🗑️ Delete", key=f"delete_{search['id']}"):
-                        if delete_property_search(search['id'], user_id):
-                            st.success("✅ Search deleted!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Failed to delete search")
-
-                # Show detailed view toggle
-                if st.button(f"👁️ View Details", key=f"view_{search['id']}"):
-                    st.session_state[f"show_details_{search['id']}"] = not st.session_state.get(f"show_details_{search['id']}", False)
-                
-                # Show detailed property information if toggled
-                if st.session_state.get(f"show_details_{search['id']}", False):
-                    st.markdown("---")
-                    
-                    # Render property cards in compact mode
-                    cards_html = render_property_cards(property_data, compact=True)
-                    
-                    if cards_html:
-                        compact_html = f"""
-                        <style>
-                            .compact-container {{
-                                display: grid;
-                                grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-                                gap: 15px;
-                                padding: 10px 0;
-                            }}
-                            .compact-card {{
-                                background: #f8f9fa;
-                                padding: 16px;
-                                border-radius: 8px;
-                                border: 1px solid #dee2e6;
-                            }}
-                            .compact-card h4 {{
-                                margin-top: 0;
-                                margin-bottom: 12px;
-                                color: #495057;
-                                font-size: 16px;
-                                font-weight: 600;
-                                border-bottom: 1px solid #adb5bd;
-                                padding-bottom: 6px;
-                            }}
-                            .compact-content {{
-                                font-size: 13px;
-                                line-height: 1.6;
-                                color: #6c757d;
-                            }}
-                            .compact-content b {{
-                                color: #495057;
-                                font-weight: 600;
-                            }}
-                        </style>
-                        <div class="compact-container">
-                            {cards_html}
-                        </div>
-                        """
-                        html(compact_html, height=400, scrolling=True)
-                    
-                    # Export options
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button(f"📄 Export as JSON", key=f"export_json_{search['id']}"):
-                            st.download_button(
-                                label="⬇️ Download JSON",
-                                data=json.dumps(property_data, indent=2, default=str),
-                                file_name=f"property_{address.replace(' ', '_').replace(',', '')}_{search_date.replace(' ', '_').replace(':', '')}.json",
-                                mime="application/json",
-                                key=f"download_json_{search['id']}"
-                            )
-                    
-                    with col2:
-                        # Re-search button (to get updated data)
-                        if st.button(f"🔄 Re-search Property", key=f"research_{search['id']}"):
-                            st.info(f"💡 Go to the 'New Search' tab and search for: {address}")
+        for search in filtered_history:
+            render_search_history_entry(search)
 
 # =====================================================
 # 8. Debug Mode (Optional)
 # =====================================================
-if st.sidebar.checkbox("🔧 Debug Mode", help="Show additional debugging information"):
-    with st.sidebar:
+@st.fragment
+def render_debug_panel():
+    """Sidebar debug panel; toggling it reruns only this fragment"""
+    if st.checkbox("🔧 Debug Mode", help="Show additional debugging information"):
         st.subheader("🔧 Debug Information")
         st.json({
             "user_id": user_id,
             "user_email": user_email,
             "queries_used": queries_used,
-            "total_searches": len(search_history) if 'search_history' in locals() else 0
+            "total_searches": len(search_history) if 'search_history' in globals() else 0
         })
+
+with st.sidebar:
+    render_debug_panel()
@@ -2,6 +2,7 @@
 # =====================================================
 
 import streamlit as st
+from bisect import bisect_right
 import plotly.express as px
 import pandas as pd
 from datetime import datetime, timedelta
@@ -24,6 +25,8 @@ st.markdown("Monitor your API usage and account activity.")
 user_email = st.session_state.user.email
 user_id = st.session_state.user.id
 queries_used = get_user_usage(user_id, user_email)
+# Share of the 30-query monthly allowance, reused by the percentage metric, progress bar and status band
+usage_ratio = queries_used / 30
 
 # Usage overview
 st.subheader("🎯 Usage Overview")
@@ -38,7 +41,7 @@ with col1:
     )
 
 with col2:
-    usage_percentage = (queries_used / 30) * 100
+    usage_percentage = usage_ratio * 100
     st.metric("Usage %", f"{usage_percentage:.1f}%")
 
 with col3:
@@ -56,18 +59,19 @@ with col4:
 
 # Progress bar
 st.subheader("📈 Usage Progress")
-progress = queries_used / 30
-st.progress(progress)
-
-# Color-coded status
-if progress >= 1.0:
-    st.error("🚫 Limit Reached - No more queries available")
-elif progress >= 0.8:
-    st.warning("⚠️ High Usage - Approaching limit")
-elif progress >= 0.5:
-    st.info("📊 Moderate Usage")
-else:
-    st.success("✅ Low Usage - Plenty of queries remaining")
+# st.progress rejects values above 1.0, which an over-limit account would otherwise hit
+st.progress(min(usage_ratio, 1.0))
+
+# Color-coded status: bisect_right picks the band, so each threshold is inclusive
+USAGE_THRESHOLDS = (0.5, 0.8, 1.0)
+USAGE_STATUS = (
+    (st.success, "✅ Low Usage - Plenty of queries remaining"),
+    (st.info, "📊 Moderate Usage"),
+    (st.warning, "⚠️ High Usage - Approaching limit"),
+    (st.error, "🚫 Limit Reached - No more queries available"),
+)
+show_status, status_message = USAGE_STATUS[bisect_right(USAGE_THRESHOLDS, usage_ratio)]
+show_status(status_message)
 
 # Usage chart (mock data - you'd want to implement proper tracking)
 st.subheader("📉 Usage Trends")
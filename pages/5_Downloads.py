@@ -1,9 +1,11 @@
 import streamlit as st
 import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from utils.auth import initialize_auth_state
-from utils.search_database import get_user_searches, get_search_by_id
+from utils.formatting import format_date
+from utils.search_database import get_user_searches, get_search_by_id, count_user_searches
 from utils.export_utils import (
     export_to_json, 
     export_to_csv, 
@@ -35,28 +37,11 @@ with st.sidebar:
     
     # Quick stats
     try:
-        recent_searches = get_user_searches(user_id, limit=10)
-        st.metric("Recent Searches", len(recent_searches))
+        st.metric("Recent Searches", min(count_user_searches(user_id), 10))
     except Exception as e:
         st.warning("⚠️ Unable to load search count")
 
 # Helper functions
-def format_date(date_str):
-    """Format date string for display"""
-    if not date_str:
-        return "N/A"
-    try:
-        if isinstance(date_str, str):
-            if 'T' in date_str:
-                date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            else:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-        else:
-            date_obj = date_str
-        return date_obj.strftime("%B %d, %Y at %I:%M %p")
-    except:
-        return str(date_str)
-
 def get_search_address(search_data):
     """Extract address from search data"""
     try:
@@ -83,6 +68,62 @@ def get_property_results(search_data):
     except:
         return []
 
+def vectorize_searches(searches):
+    """Extract per-search result counts and search days into column arrays"""
+    result_counts = np.fromiter(
+        (len(get_property_results(search.get("property_data", {}))) for search in searches),
+        dtype=np.int64,
+        count=len(searches),
+    )
+    # Malformed dates become NaT (dropped by the analytics) instead of failing the whole array
+    search_days = pd.to_datetime(
+        [
+            search_date[:10] if search_date and isinstance(search_date, str) else None
+            for search_date in (search.get("search_date") for search in searches)
+        ],
+        format="%Y-%m-%d",
+        errors="coerce",
+    ).to_numpy().astype("datetime64[D]")
+    return {"result_counts": result_counts, "search_days": search_days}
+
+@st.cache_data(show_spinner=False)
+def property_preview_frame(prop):
+    """Build a two-column field/value table for the property preview"""
+    sq_ft = prop.get('squareFootage')
+    last_sale = prop.get('lastSalePrice')
+    return pd.DataFrame({
+        "Field": ["Type", "Bedrooms", "Bathrooms", "Sq Ft", "Year Built", "Last Sale"],
+        "Value": [
+            str(prop.get('propertyType', 'N/A')),
+            str(prop.get('bedrooms', 'N/A')),
+            str(prop.get('bathrooms', 'N/A')),
+            f"{sq_ft:,}" if sq_ft else "N/A",
+            str(prop.get('yearBuilt', 'N/A')),
+            f"${last_sale:,}" if last_sale else "N/A",
+        ],
+    })
+
+# Export payloads are rebuilt only when the selected search changes, not on every rerun
+@st.cache_data(show_spinner=False)
+def cached_json_export(property_data, search_id):
+    """Cached wrapper around export_to_json"""
+    return export_to_json(property_data, search_id)
+
+@st.cache_data(show_spinner=False)
+def cached_csv_export(results, search_id):
+    """Cached wrapper around export_to_csv"""
+    return export_to_csv(results, search_id)
+
+@st.cache_data(show_spinner=False)
+def cached_excel_export(search, results, search_id):
+    """Cached wrapper around export_to_excel"""
+    return export_to_excel(results, get_export_summary(search), search_id)
+
+@st.cache_data(show_spinner=False)
+def cached_pdf_export(search, results, search_id):
+    """Cached wrapper around export_to_pdf_report"""
+    return export_to_pdf_report(results, get_export_summary(search), search_id)
+
 # Main content tabs
 tab1, tab2, tab3 = st.tabs(["📋 Individual Downloads", "📦 Bulk Downloads", "📊 Export Analytics"])
 
@@ -100,26 +141,23 @@ with tab1:
             with col1:
                 search_filter = st.text_input("🔍 Filter searches", placeholder="Enter address to filter...")
             with col2:
-                if st.button("🔄 Refresh", use_container_width=True):
-                    st.rerun()
+                # The click itself reruns the page, which reloads the searches
+                st.button("🔄 Refresh", use_container_width=True)
             
-            # Filter searches
-            if search_filter:
-                filtered_searches = []
-                for search in searches:
-                    address = get_search_address(search.get("property_data", {}))
-                    if search_filter.lower() in address.lower():
-                        filtered_searches.append(search)
-                searches = filtered_searches
+            # Filter searches and build the dropdown labels in one pass
+            needle = search_filter.lower()
+            filtered_searches = []
+            search_options = []
+            for search in searches:
+                address = get_search_address(search.get("property_data", {}))
+                if needle and needle not in address.lower():
+                    continue
+                filtered_searches.append(search)
+                search_options.append(f"{address} - {format_date(search.get('search_date', ''))}")
+            searches = filtered_searches
             
             if searches:
                 # Search selection dropdown
-                search_options = []
-                for search in searches:
-                    address = get_search_address(search.get("property_data", {}))
-                    search_date = format_date(search.get("search_date", ""))
-                    search_options.append(f"{address} - {search_date}")
-                
                 selected_index = st.selectbox(
                     "Select a search to download:",
                     range(len(search_options)),
@@ -145,19 +183,11 @@ with tab1:
                 if results:
                     # Show first property as preview
                     with st.expander("📋 Property Preview", expanded=False):
-                        prop = results[0]
-                        
-                        preview_col1, preview_col2, preview_col3 = st.columns(3)
-                        with preview_col1:
-                            st.write(f"**Type:** {prop.get('propertyType', 'N/A')}")
-                            st.write(f"**Bedrooms:** {prop.get('bedrooms', 'N/A')}")
-                        with preview_col2:
-                            st.write(f"**Bathrooms:** {prop.get('bathrooms', 'N/A')}")
-                            st.write(f"**Sq Ft:** {prop.get('squareFootage', 'N/A'):,}" if prop.get('squareFootage') else "**Sq Ft:** N/A")
-                        with preview_col3:
-                            st.write(f"**Year Built:** {prop.get('yearBuilt', 'N/A')}")
-                            last_sale = prop.get('lastSalePrice')
-                            st.write(f"**Last Sale:** ${last_sale:,}" if last_sale else "**Last Sale:** N/A")
+                        st.dataframe(
+                            property_preview_frame(results[0]),
+                            hide_index=True,
+                            use_container_width=True
+                        )
                     
                     # Download options
                     st.markdown("### 📥 Download Options")
@@ -167,7 +197,7 @@ with tab1:
                     with download_col1:
                         # JSON download
                         try:
-                            json_data, json_filename = export_to_json(property_data, search_id)
+                            json_data, json_filename = cached_json_export(property_data, search_id)
                             st.download_button(
                                 label="📄 JSON",
                                 data=json_data,
@@ -182,7 +212,7 @@ with tab1:
                     with download_col2:
                         # CSV download
                         try:
-                            csv_data, csv_filename = export_to_csv(results, search_id)
+                            csv_data, csv_filename = cached_csv_export(results, search_id)
                             st.download_button(
                                 label="📊 CSV",
                                 data=csv_data,
@@ -197,8 +227,7 @@ with tab1:
                     with download_col3:
                         # Excel download
                         try:
-                            search_summary = get_export_summary(selected_search)
-                            excel_bytes, excel_filename = export_to_excel(results, search_summary, search_id)
+                            excel_bytes, excel_filename = cached_excel_export(selected_search, results, search_id)
                             st.download_button(
                                 label="📈 Excel",
                                 data=excel_bytes,
@@ -213,8 +242,7 @@ with tab1:
                     with download_col4:
                         # PDF download
                         try:
-                            search_summary = get_export_summary(selected_search)
-                            pdf_bytes, pdf_filename = export_to_pdf_report(results, search_summary, search_id)
+                            pdf_bytes, pdf_filename = cached_pdf_export(selected_search, results, search_id)
                             st.download_button(
                                 label="📑 PDF Report",
                                 data=pdf_bytes,
@@ -269,21 +297,13 @@ with tab2:
                 st.write("")  # Spacer
                 apply_filter = st.button("Apply Filter", use_container_width=True)
             
-            # Filter searches by date
-            filtered_searches = []
-            for search in searches:
-                search_date_str = search.get("search_date", "")
-                if search_date_str:
-                    try:
-                        if 'T' in search_date_str:
-                            search_date = datetime.fromisoformat(search_date_str.replace('Z', '+00:00')).date()
-                        else:
-                            search_date = datetime.strptime(search_date_str, "%Y-%m-%d %H:%M:%S").date()
-                        
-                        if start_date <= search_date <= end_date:
-                            filtered_searches.append(search)
-                    except:
-                        continue
+            # Filter searches by date; both stored formats start with the YYYY-MM-DD day, so the
+            # range test compares that prefix as a string (as vectorize_searches does) without parsing
+            start_day, end_day = start_date.isoformat(), end_date.isoformat()
+            filtered_searches = [
+                search for search in searches
+                if start_day <= (search.get("search_date") or "")[:10] <= end_day
+            ]
             
             if filtered_searches:
                 st.success(f"Found {len(filtered_searches)} searches in the selected date range")
@@ -391,9 +411,13 @@ with tab3:
     st.markdown("Track your download activity and export patterns.")
     
     try:
-        searches = get_user_searches(user_id, limit=200)
+        searches = get_user_searches(user_id, limit=200, columns="id, search_date, property_data")
         
         if searches:
+            # Pull the analysed fields out once; every metric below is an array reduction
+            columns = vectorize_searches(searches)
+            result_counts = columns["result_counts"]
+            
             # Export statistics
             col1, col2, col3, col4 = st.columns(4)
             
@@ -402,13 +426,8 @@ with tab3:
             
             with col2:
                 # Count searches with results
-                searches_with_results = 0
-                total_properties = 0
-                for search in searches:
-                    results = get_property_results(search.get("property_data", {}))
-                    if results:
-                        searches_with_results += 1
-                        total_properties += len(results)
+                searches_with_results = int(np.count_nonzero(result_counts))
+                total_properties = int(result_counts.sum())
                 
                 st.metric("Searches with Results", searches_with_results)
             
@@ -422,44 +441,33 @@ with tab3:
             # Search activity chart
             st.markdown("### 📈 Search Activity Over Time")
             
-            # Group searches by date
-            search_dates = {}
-            for search in searches:
-                search_date = search.get("search_date", "")
-                if search_date:
-                    try:
-                        date_key = search_date.split("T")[0]  # Get just the date part
-                        search_dates[date_key] = search_dates.get(date_key, 0) + 1
-                    except:
-                        continue
+            # Group searches by date (np.unique returns the days already sorted)
+            search_days = columns["search_days"]
+            days, day_counts = np.unique(search_days[~np.isnat(search_days)], return_counts=True)
             
-            if search_dates:
-                df_chart = pd.DataFrame(list(search_dates.items()), columns=["Date", "Searches"])
-                df_chart["Date"] = pd.to_datetime(df_chart["Date"])
-                df_chart = df_chart.sort_values("Date")
+            if days.size:
+                df_chart = pd.DataFrame({"Date": days, "Searches": day_counts})
                 
                 st.line_chart(df_chart.set_index("Date"))
             
             # Most productive searches
             st.markdown("### 🏆 Most Productive Searches")
             
-            productive_searches = []
-            for search in searches:
-                results = get_property_results(search.get("property_data", {}))
-                if results:
-                    productive_searches.append({
-                        "Address": get_search_address(search.get("property_data", {})),
-                        "Properties Found": len(results),
-                        "Date": format_date(search.get("search_date", "")),
-                        "Search ID": search.get("id")
-                    })
+            # Top 10 by properties found; the stable sort keeps ties in search order
+            top_indices = np.argsort(-result_counts, kind="stable")[:10]
+            productive_searches = [
+                {
+                    "Address": get_search_address(searches[i].get("property_data", {})),
+                    "Properties Found": int(result_counts[i]),
+                    "Date": format_date(searches[i].get("search_date", "")),
+                    "Search ID": searches[i].get("id")
+                }
+                for i in top_indices
+                if result_counts[i] > 0
+            ]
             
             if productive_searches:
-                # Sort by properties found
-                productive_searches.sort(key=lambda x: x["Properties Found"], reverse=True)
-                
-                # Show top 10
-                df_productive = pd.DataFrame(productive_searches[:10])
+                df_productive = pd.DataFrame(productive_searches)
                 st.dataframe(df_productive, use_container_width=True)
             
             # Export format recommendations
@@ -473,9 +481,7 @@ with tab3:
                 - Best for: Data analysis, spreadsheet work
                 - Use when: Working with Excel, Google Sheets
                 - Contains: Basic property information
-                """)
                 
-                st.markdown("""
                 **📈 Excel Format**
                 - Best for: Complex analysis, multiple data views
                 - Use when: Need tax assessments, property taxes
@@ -488,9 +494,7 @@ with tab3:
                 - Best for: Developers, API integration
                 - Use when: Building applications, data processing
                 - Contains: Complete raw data structure
-                """)
                 
-                st.markdown("""
                 **📑 PDF Report**
                 - Best for: Presentations, client reports
                 - Use when: Sharing with non-technical users
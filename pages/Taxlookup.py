@@ -1,5 +1,5 @@
 import streamlit as st
-import json
+import orjson
 import pandas as pd
 import requests
 from datetime import datetime
@@ -137,7 +137,8 @@ hide_streamlit_style = """
     }
 </style>
 """
-st.markdown(hide_streamlit_style, unsafe_allow_html=True)
+# Style-only HTML goes straight to the page head, bypassing the markdown renderer
+st.html(hide_streamlit_style)
 
 # --------------------------
 # Complete Ohio Counties Configuration (All 88 Counties)
@@ -452,47 +453,84 @@ def search_ohio_property_comprehensive(search_term, search_type="parcel", county
 # --------------------------
 # Clean Property Display Functions (No HTML, Clean Info Only)
 # --------------------------
+# Alternative key names the property APIs use for each card field, in priority order
+FIELD_ALIASES = {
+    'address': ('address', 'property_address', 'street_address'),
+    'city': ('addr_city', 'city', 'municipality'),
+    'zip': ('addr_zip', 'zip', 'zip_code', 'postal_code'),
+    'market_value': ('mkt_val_tot', 'market_value', 'assessed_value', 'appraised_value'),
+    'parcel_id': ('parcel_id', 'parcelid', 'parcel_number'),
+    'county_name': ('county_name', 'county'),
+    'land_use_class': ('land_use_class', 'property_type', 'land_use', 'property_class'),
+    'bldg_sqft': ('bldg_sqft', 'square_feet', 'sqft'),
+    'acreage': ('acreage', 'lot_size', 'lot_area'),
+    'owner': ('owner', 'owner_name', 'property_owner'),
+    'school_district': ('school_district', 'district'),
+}
+
+def first_present(data, field, default='N/A'):
+    """Return the value of the first alias of field present in data"""
+    for key in FIELD_ALIASES[field]:
+        if key in data:
+            return data[key]
+    return default
+
+def numeric_value(value, default=None):
+    """Coerce an API field to float, returning default when it is missing or not numeric"""
+    # Parsed JSON numbers are the common case; exact class checks skip the string handling
+    if value.__class__ is float or value.__class__ is int:
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.replace(',', '').replace('$', '').strip())
+        except ValueError:
+            return default
+    return default
+
+def format_dollars(value):
+    """Format an API money field as $1,234.56, or N/A when it is empty or not numeric"""
+    amount = numeric_value(value)
+    return f"${amount:,.2f}" if amount else 'N/A'
+
 def create_clean_property_info_cards(data):
     """Create clean property information cards without HTML formatting"""
     
     # Highlighted Address Section
-    property_address = data.get('address', data.get('property_address', data.get('street_address', 'N/A')))
-    city = data.get('addr_city', data.get('city', data.get('municipality', 'N/A')))
-    zip_code = data.get('addr_zip', data.get('zip', data.get('zip_code', data.get('postal_code', 'N/A'))))
+    property_address = first_present(data, 'address')
+    city = first_present(data, 'city')
+    zip_code = first_present(data, 'zip')
     zip_plus_four = data.get('addr_zipplusfour', '')
     full_zip = f"{zip_code}-{zip_plus_four}" if zip_plus_four else zip_code
     
-    st.markdown(f"""
+    address_html = f"""
     <div class='address-highlight'>
         <h3>📍 Property Address</h3>
         <div class='address-text'>{property_address}</div>
         <div class='address-text'>{city}, OH {full_zip}</div>
     </div>
-    """, unsafe_allow_html=True)
+    """
     
-    # Mailing Address Section
+    # Mailing Address Section (rendered in the same markdown call as the address)
     mail_address1 = data.get('mail_address1', 'N/A')
     mail_address3 = data.get('mail_address3', 'N/A')
     
     if mail_address1 != 'N/A' or mail_address3 != 'N/A':
-        st.markdown(f"""
+        address_html += f"""
         <div class='mailing-address'>
             <h4>📮 Mailing Address</h4>
             <div>{mail_address1}</div>
             <div>{mail_address3}</div>
         </div>
-        """, unsafe_allow_html=True)
+        """
+    
+    st.markdown(address_html, unsafe_allow_html=True)
     
     # Main property overview with gradient cards (Light Blue Theme)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         # Market Value - Light Blue gradient
-        market_value = data.get('mkt_val_tot', data.get('market_value', data.get('assessed_value', data.get('appraised_value', 0))))
-        try:
-            market_value = float(market_value) if market_value else 0
-        except:
-            market_value = 0
+        market_value = numeric_value(first_present(data, 'market_value', 0), 0)
         
         st.markdown(f"""
         <div style='background: linear-gradient(135deg, #42A5F5 0%, #1E88E5 100%); 
@@ -506,8 +544,8 @@ def create_clean_property_info_cards(data):
     
     with col2:
         # Parcel Information - Medium Blue gradient
-        parcel_id = data.get('parcel_id', data.get('parcelid', data.get('parcel_number', 'N/A')))
-        county_name = data.get('county_name', data.get('county', 'N/A'))
+        parcel_id = first_present(data, 'parcel_id')
+        county_name = first_present(data, 'county_name')
         
         st.markdown(f"""
         <div style='background: linear-gradient(135deg, #2196F3 0%, #1976D2 100%); 
@@ -521,9 +559,9 @@ def create_clean_property_info_cards(data):
     
     with col3:
         # Property Details - Light Blue gradient
-        land_use_class = data.get('land_use_class', data.get('property_type', data.get('land_use', data.get('property_class', 'N/A'))))
-        bldg_sqft = data.get('bldg_sqft', data.get('square_feet', data.get('sqft', 'N/A')))
-        acreage = data.get('acreage', data.get('lot_size', data.get('lot_area', 'N/A')))
+        land_use_class = first_present(data, 'land_use_class')
+        bldg_sqft = first_present(data, 'bldg_sqft')
+        acreage = first_present(data, 'acreage')
         
         st.markdown(f"""
         <div style='background: linear-gradient(135deg, #64B5F6 0%, #42A5F5 100%); 
@@ -538,8 +576,8 @@ def create_clean_property_info_cards(data):
     
     with col4:
         # Owner Information - Dark Blue gradient
-        owner = data.get('owner', data.get('owner_name', data.get('property_owner', 'N/A')))
-        school_district = data.get('school_district', data.get('district', 'N/A'))
+        owner = first_present(data, 'owner')
+        school_district = first_present(data, 'school_district')
         owner_occupied = data.get('owner_occupied', 'N/A')
         
         st.markdown(f"""
@@ -623,13 +661,10 @@ def display_clean_property_details(data):
         st.write("**Financial Information**")
         col1, col2 = st.columns(2)
         with col1:
-            try:
-                sale_price = f"${float(data.get('sale_price', 0)):,.2f}" if data.get('sale_price') else 'N/A'
-                mkt_val_land = f"${float(data.get('mkt_val_land', 0)):,.2f}" if data.get('mkt_val_land') else 'N/A'
-                mkt_val_bldg = f"${float(data.get('mkt_val_bldg', 0)):,.2f}" if data.get('mkt_val_bldg') else 'N/A'
-                mkt_val_tot = f"${float(data.get('mkt_val_tot', 0)):,.2f}" if data.get('mkt_val_tot') else 'N/A'
-            except:
-                sale_price = mkt_val_land = mkt_val_bldg = mkt_val_tot = 'N/A'
+            sale_price = format_dollars(data.get('sale_price'))
+            mkt_val_land = format_dollars(data.get('mkt_val_land'))
+            mkt_val_bldg = format_dollars(data.get('mkt_val_bldg'))
+            mkt_val_tot = format_dollars(data.get('mkt_val_tot'))
             
             st.write(f"**Sale Price:** {sale_price}")
             st.write(f"**Market Value - Land:** {mkt_val_land}")
@@ -643,7 +678,8 @@ def display_clean_property_details(data):
         col1, col2 = st.columns(2)
         with col1:
             bldg_sqft = f"{int(data.get('bldg_sqft', 0)):,} sq ft" if data.get('bldg_sqft') and str(data.get('bldg_sqft')).isdigit() else data.get('bldg_sqft', 'N/A')
-            acreage = f"{float(data.get('acreage', 0)):.3f} acres" if data.get('acreage') else 'N/A'
+            acreage_value = numeric_value(data.get('acreage'))
+            acreage = f"{acreage_value:.3f} acres" if acreage_value else 'N/A'
             
             st.write(f"**Building Sq Ft:** {bldg_sqft}")
             st.write(f"**Land Use Code:** {data.get('land_use_code', 'N/A')}")
@@ -830,6 +866,15 @@ def create_enhanced_ohio_pdf(data):
     buffer.seek(0)
     return buffer
 
+def reset_usage_state():
+    """Clear usage counters and session search data (Reset Usage Count callback)"""
+    st.session_state.usage_count = 0
+    st.session_state.search_history = []
+    st.session_state.cached_results = {}
+    st.session_state.all_search_results = []
+    st.session_state.current_property_data = None
+    st.session_state.last_search_timestamp = None
+
 # --------------------------
 # Initialize Session State
 # --------------------------
@@ -904,14 +949,8 @@ with st.sidebar:
     st.divider()
     
     # Reset usage button
-    if st.button("🔄 Reset Usage Count", help="Reset your search count to start over"):
-        st.session_state.usage_count = 0
-        st.session_state.search_history = []
-        st.session_state.cached_results = {}
-        st.session_state.all_search_results = []
-        st.session_state.current_property_data = None
-        st.session_state.last_search_timestamp = None
-        st.rerun()
+    st.button("🔄 Reset Usage Count", help="Reset your search count to start over",
+              on_click=reset_usage_state)
 
 # --------------------------
 # Main App UI - Enhanced
@@ -1029,7 +1068,7 @@ if search_button and parcel_id:
                             mime="application/pdf"
                         )
                     with col2:
-                        json_str = json.dumps(results[0] if len(results) == 1 else results, indent=2)
+                        json_str = orjson.dumps(results[0] if len(results) == 1 else results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
                         st.download_button(
                             "📋 Download Property JSON", 
                             json_str,
@@ -1039,7 +1078,7 @@ if search_button and parcel_id:
                     with col3:
                         # Raw API Response JSON
                         if api_response.get('raw_response'):
-                            raw_json_str = json.dumps(api_response['raw_response'], indent=2)
+                            raw_json_str = orjson.dumps(api_response['raw_response'], option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
                             st.download_button(
                                 "🔧 Download Raw API Response", 
                                 raw_json_str,
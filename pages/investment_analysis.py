@@ -11,24 +11,31 @@ from supabase import create_client, Client
 st.set_page_config(page_title="Investment Analysis", page_icon="📊", layout="wide")
 
 # Supabase configuration
-@st.cache_resource
-def get_supabase_client():
-    """Get Supabase client"""
+@st.cache_resource(max_entries=256, ttl=3600)
+def get_supabase_client(supabase_url: str, supabase_key: str, access_token: Optional[str] = None) -> Optional[Client]:
+    """Get Supabase client (cached per URL/key/access token, so users never share auth headers)"""
+    try:
+        client = create_client(supabase_url, supabase_key)
+        if access_token:
+            client.postgrest.auth(access_token)
+        return client
+    except:
+        return None
+
+def init_supabase(access_token: Optional[str] = None) -> Optional[Client]:
+    """Look up Supabase credentials and return the cached client for them"""
     try:
         SUPABASE_URL = st.secrets["supabase"]["url"]
         SUPABASE_ANON_KEY = st.secrets["supabase"]["anon_key"]
-        return create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
     except:
         return None
+    return get_supabase_client(SUPABASE_URL, SUPABASE_ANON_KEY, access_token)
 
 def get_user_client():
     """Return Supabase client authorized with current user's access token."""
     if "access_token" not in st.session_state:
         return None
-    client = get_supabase_client()
-    if client and st.session_state.access_token:
-        client.postgrest.auth(st.session_state.access_token)
-    return client
+    return init_supabase(st.session_state.access_token)
 
 # Check if user is authenticated
 if "user" not in st.session_state or st.session_state.user is None:
@@ -66,81 +73,91 @@ def calculate_mortgage_payment(principal: float, annual_rate: float, years: int)
     
     monthly_rate = annual_rate / 100 / 12
     num_payments = years * 12
+    growth = (1 + monthly_rate)**num_payments
     
-    payment = principal * (monthly_rate * (1 + monthly_rate)**num_payments) / ((1 + monthly_rate)**num_payments - 1)
+    payment = principal * (monthly_rate * growth) / (growth - 1)
     return payment
 
-def load_properties_from_db(user_id: str) -> List[Dict[str, Any]]:
-    """Load properties from Supabase database"""
-    try:
-        client = get_user_client()
-        if not client:
-            return []
-        
-        # Try to get property searches from database - use flexible column selection
-        try:
-            response = client.table("property_searches").select("*").eq("user_id", user_id).limit(50).execute()
-        except Exception as e:
-            # If the table doesn't exist or has different structure, try alternative approaches
-            st.warning(f"Could not load from property_searches table: {str(e)}")
-            return []
-        
-        properties = []
-        if response.data:
-            for search in response.data:
-                property_data = search.get("property_data", {})
+def format_dollar_column(values: pd.Series, spec: str) -> List[str]:
+    """Format a numeric column as dollar strings in one pass, with N/A for non-positive values"""
+    return [f"${v:{spec}}" if v > 0 else "N/A" for v in values.tolist()]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_properties_from_db(user_id: str) -> List[Dict[str, Any]]:
+    """Load properties from Supabase database (cached per user for 5 minutes).
+
+    Errors propagate instead of returning [], so a failed load is never cached.
+    """
+    client = get_user_client()
+    
+    # Try to get property searches from database - use flexible column selection
+    response = client.table("property_searches").select("property_data").eq("user_id", user_id).limit(50).execute()
+    
+    properties = []
+    if response.data:
+        for search in response.data:
+            property_data = search.get("property_data", {})
+            
+            # Handle different possible data structures
+            if isinstance(property_data, str):
+                try:
+                    property_data = json.loads(property_data)
+                except:
+                    continue
+            
+            results = property_data.get("results", [])
+            
+            for prop in results:
+                get = prop.get  # bound once; read ~20 times below
                 
-                # Handle different possible data structures
-                if isinstance(property_data, str):
-                    try:
-                        property_data = json.loads(property_data)
-                    except:
-                        continue
+                # Extract key investment data
+                investment_prop = {
+                    "id": get("id", ""),
+                    "address": get("formattedAddress", ""),
+                    "property_type": get("propertyType", ""),
+                    "bedrooms": get("bedrooms", 0),
+                    "bathrooms": get("bathrooms", 0),
+                    "square_footage": get("squareFootage", 0),
+                    "lot_size": get("lotSize", 0),
+                    "year_built": get("yearBuilt", 0),
+                    "last_sale_price": get("lastSalePrice", 0),
+                    "last_sale_date": get("lastSaleDate", ""),
+                    "county": get("county", ""),
+                    "state": get("state", ""),
+                    "zoning": get("zoning", ""),
+                    "owner_occupied": get("ownerOccupied", False),
+                    "latitude": get("latitude", 0),
+                    "longitude": get("longitude", 0)
+                }
                 
-                results = property_data.get("results", [])
+                # Add tax information
+                tax_assessments = get("taxAssessments", {})
+                property_taxes = get("propertyTaxes", {})
                 
-                for prop in results:
-                    # Extract key investment data
-                    investment_prop = {
-                        "id": prop.get("id", ""),
-                        "address": prop.get("formattedAddress", ""),
-                        "property_type": prop.get("propertyType", ""),
-                        "bedrooms": prop.get("bedrooms", 0),
-                        "bathrooms": prop.get("bathrooms", 0),
-                        "square_footage": prop.get("squareFootage", 0),
-                        "lot_size": prop.get("lotSize", 0),
-                        "year_built": prop.get("yearBuilt", 0),
-                        "last_sale_price": prop.get("lastSalePrice", 0),
-                        "last_sale_date": prop.get("lastSaleDate", ""),
-                        "county": prop.get("county", ""),
-                        "state": prop.get("state", ""),
-                        "zoning": prop.get("zoning", ""),
-                        "owner_occupied": prop.get("ownerOccupied", False),
-                        "latitude": prop.get("latitude", 0),
-                        "longitude": prop.get("longitude", 0)
-                    }
-                    
-                    # Add tax information
-                    tax_assessments = prop.get("taxAssessments", {})
-                    property_taxes = prop.get("propertyTaxes", {})
-                    
-                    if tax_assessments:
-                        latest_year = max(tax_assessments.keys())
-                        latest_assessment = tax_assessments[latest_year]
-                        investment_prop.update({
-                            "assessed_value": latest_assessment.get("value", 0),
-                            "land_value": latest_assessment.get("land", 0),
-                            "improvement_value": latest_assessment.get("improvements", 0)
-                        })
-                    
-                    if property_taxes:
-                        latest_tax_year = max(property_taxes.keys())
-                        investment_prop["annual_property_tax"] = property_taxes[latest_tax_year].get("total", 0)
-                    
-                    properties.append(investment_prop)
-        
-        return properties
-        
+                if tax_assessments:
+                    latest_year = max(tax_assessments.keys())
+                    latest_assessment = tax_assessments[latest_year]
+                    investment_prop.update({
+                        "assessed_value": latest_assessment.get("value", 0),
+                        "land_value": latest_assessment.get("land", 0),
+                        "improvement_value": latest_assessment.get("improvements", 0)
+                    })
+                
+                if property_taxes:
+                    latest_tax_year = max(property_taxes.keys())
+                    investment_prop["annual_property_tax"] = property_taxes[latest_tax_year].get("total", 0)
+                
+                properties.append(investment_prop)
+    
+    return properties
+
+def load_properties_from_db(user_id: str) -> List[Dict[str, Any]]:
+    """Load the user's properties; [] (uncached) when signed out or the query fails"""
+    if not get_user_client():
+        return []
+    
+    try:
+        return fetch_properties_from_db(user_id)
     except Exception as e:
         st.error(f"Error loading properties from database: {str(e)}")
         return []
@@ -500,7 +517,7 @@ elif analysis_type == "Portfolio Overview":
         st.success(f"Found {len(analyses)} saved analyses")
         
         # Portfolio summary metrics
-        total_properties = len([a for a in analyses if a.get("analysis_type") == "property_analysis"])
+        total_properties = sum(1 for a in analyses if a.get("analysis_type") == "property_analysis")
         
         if total_properties > 0:
             # Calculate portfolio totals
@@ -638,14 +655,13 @@ elif analysis_type == "Market Comparison":
             st.markdown("### 📊 Market Statistics")
             
             stats_cols = st.columns(4)
+            price_stats = filtered_df["Last Sale Price"].agg(["mean", "median"])
             
             with stats_cols[0]:
-                avg_price = filtered_df["Last Sale Price"].mean()
-                st.metric("Average Price", f"${avg_price:,.0f}")
+                st.metric("Average Price", f"${price_stats['mean']:,.0f}")
             
             with stats_cols[1]:
-                median_price = filtered_df["Last Sale Price"].median()
-                st.metric("Median Price", f"${median_price:,.0f}")
+                st.metric("Median Price", f"${price_stats['median']:,.0f}")
             
             with stats_cols[2]:
                 avg_price_per_sqft = filtered_df["Price per Sq Ft"].mean()
@@ -671,11 +687,12 @@ elif analysis_type == "Market Comparison":
             # Comparison table
             st.markdown("### 📋 Property Comparison Table")
             
-            # Format the dataframe for display
-            display_df = filtered_df.copy()
-            display_df["Last Sale Price"] = display_df["Last Sale Price"].apply(lambda x: f"${x:,.0f}" if x > 0 else "N/A")
-            display_df["Price per Sq Ft"] = display_df["Price per Sq Ft"].apply(lambda x: f"${x:.2f}" if x > 0 else "N/A")
-            display_df["Property Tax"] = display_df["Property Tax"].apply(lambda x: f"${x:,.0f}" if x > 0 else "N/A")
+            # Format the dataframe for display; assign shares the untouched columns instead of copying the frame
+            display_df = filtered_df.assign(**{
+                "Last Sale Price": format_dollar_column(filtered_df["Last Sale Price"], ",.0f"),
+                "Price per Sq Ft": format_dollar_column(filtered_df["Price per Sq Ft"], ".2f"),
+                "Property Tax": format_dollar_column(filtered_df["Property Tax"], ",.0f"),
+            })
             
             st.dataframe(display_df, use_container_width=True, hide_index=True)
         
@@ -796,8 +813,8 @@ st.markdown("### 🔧 Additional Tools")
 tool_cols = st.columns(3)
 
 with tool_cols[0]:
-    if st.button("🔄 Refresh Data", use_container_width=True):
-        st.rerun()
+    # Drop only this user's cached properties; other sessions keep theirs
+    st.button("🔄 Refresh Data", use_container_width=True, on_click=fetch_properties_from_db.clear, args=(user_id,))
 
 with tool_cols[1]:
     if st.button("📊 Export Analysis", use_container_width=True):
@@ -1,13 +1,15 @@
 import streamlit as st
-import json
+import orjson
 import pandas as pd
 from datetime import datetime
 from utils.auth import initialize_auth_state
+from utils.formatting import format_date
 from utils.search_database import (
     get_user_searches, 
     get_search_by_id, 
     delete_search, 
     get_search_statistics,
+    clear_search_statistics,
     save_named_search,
     get_saved_searches
 )
@@ -42,23 +44,6 @@ with st.sidebar:
         st.warning("⚠️ Unable to load search statistics")
 
 # Helper functions
-def format_date(date_str):
-    """Format date string for display"""
-    if not date_str:
-        return "N/A"
-    try:
-        if isinstance(date_str, str):
-            # Handle different date formats
-            if 'T' in date_str:
-                date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            else:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-        else:
-            date_obj = date_str
-        return date_obj.strftime("%B %d, %Y at %I:%M %p")
-    except:
-        return str(date_str)
-
 def get_search_address(search_data):
     """Extract address from search data"""
     try:
@@ -85,6 +70,16 @@ def get_property_count(search_data):
     except:
         return 0
 
+def toggle_state_flag(key):
+    """Flip a boolean session state flag (used as a button callback)"""
+    st.session_state[key] = not st.session_state.get(key, False)
+
+def tax_year_key(year):
+    """Sort key for tax year keys such as "2023" or "2023-Q1" (numeric year first)"""
+    year = str(year)
+    prefix = year[:4]
+    return (int(prefix), year) if prefix.isdecimal() else (0, year)
+
 def display_property_card(prop, index=0):
     """Display detailed property card with all available information"""
     with st.container():
@@ -134,32 +129,37 @@ def display_property_card(prop, index=0):
             st.markdown("#### 🏗️ Property Features")
             feature_cols = st.columns(3)
             
+            # One markdown block per column; lines are joined with markdown hard breaks
             with feature_cols[0]:
-                st.markdown("**Structure:**")
-                st.write(f"• Floors: {features.get('floorCount', 'N/A')}")
-                st.write(f"• Rooms: {features.get('roomCount', 'N/A')}")
-                st.write(f"• Units: {features.get('unitCount', 'N/A')}")
-                st.write(f"• Architecture: {features.get('architectureType', 'N/A')}")
-                st.write(f"• Exterior: {features.get('exteriorType', 'N/A')}")
-                st.write(f"• Foundation: {features.get('foundationType', 'N/A')}")
+                st.markdown("  \n".join([
+                    "**Structure:**",
+                    f"• Floors: {features.get('floorCount', 'N/A')}",
+                    f"• Rooms: {features.get('roomCount', 'N/A')}",
+                    f"• Units: {features.get('unitCount', 'N/A')}",
+                    f"• Architecture: {features.get('architectureType', 'N/A')}",
+                    f"• Exterior: {features.get('exteriorType', 'N/A')}",
+                    f"• Foundation: {features.get('foundationType', 'N/A')}",
+                ]))
             
             with feature_cols[1]:
-                st.markdown("**Systems:**")
-                st.write(f"• Heating: {features.get('heatingType', 'N/A') if features.get('heating') else 'None'}")
-                st.write(f"• Cooling: {features.get('coolingType', 'N/A') if features.get('cooling') else 'None'}")
-                st.write(f"• Roof: {features.get('roofType', 'N/A')}")
-                if features.get('fireplace'):
-                    st.write(f"• Fireplace: {features.get('fireplaceType', 'Yes')}")
-                else:
-                    st.write("• Fireplace: No")
+                fireplace = features.get('fireplaceType', 'Yes') if features.get('fireplace') else 'No'
+                st.markdown("  \n".join([
+                    "**Systems:**",
+                    f"• Heating: {features.get('heatingType', 'N/A') if features.get('heating') else 'None'}",
+                    f"• Cooling: {features.get('coolingType', 'N/A') if features.get('cooling') else 'None'}",
+                    f"• Roof: {features.get('roofType', 'N/A')}",
+                    f"• Fireplace: {fireplace}",
+                ]))
             
             with feature_cols[2]:
-                st.markdown("**Parking:**")
                 if features.get('garage'):
-                    st.write(f"• Garage Type: {features.get('garageType', 'N/A')}")
-                    st.write(f"• Garage Spaces: {features.get('garageSpaces', 'N/A')}")
+                    parking_lines = [
+                        f"• Garage Type: {features.get('garageType', 'N/A')}",
+                        f"• Garage Spaces: {features.get('garageSpaces', 'N/A')}",
+                    ]
                 else:
-                    st.write("• Garage: No")
+                    parking_lines = ["• Garage: No"]
+                st.markdown("  \n".join(["**Parking:**"] + parking_lines))
         
         # Owner information
         owner = prop.get('owner', {})
@@ -168,11 +168,12 @@ def display_property_card(prop, index=0):
             owner_cols = st.columns(2)
             
             with owner_cols[0]:
-                st.write(f"**Owner Type:** {owner.get('type', 'N/A')}")
+                owner_lines = [f"**Owner Type:** {owner.get('type', 'N/A')}"]
                 names = owner.get('names', [])
                 if names:
-                    st.write(f"**Owner Name(s):** {', '.join(names)}")
-                st.write(f"**Owner Occupied:** {'Yes' if prop.get('ownerOccupied') else 'No'}")
+                    owner_lines.append(f"**Owner Name(s):** {', '.join(names)}")
+                owner_lines.append(f"**Owner Occupied:** {'Yes' if prop.get('ownerOccupied') else 'No'}")
+                st.markdown("  \n".join(owner_lines))
             
             with owner_cols[1]:
                 mailing_addr = owner.get('mailingAddress', {})
@@ -194,7 +195,7 @@ def display_property_card(prop, index=0):
             if property_taxes:
                 years.update(property_taxes.keys())
             
-            for year in sorted(years, reverse=True):
+            for year in sorted(years, key=tax_year_key, reverse=True):
                 year_data = {"Year": year}
                 
                 if year in tax_assessments:
@@ -234,13 +235,13 @@ def display_property_card(prop, index=0):
             location_cols = st.columns(2)
             
             with location_cols[0]:
-                st.write(f"**Latitude:** {prop.get('latitude')}")
-                st.write(f"**Longitude:** {prop.get('longitude')}")
+                st.markdown(f"**Latitude:** {prop.get('latitude')}  \n"
+                            f"**Longitude:** {prop.get('longitude')}")
             
             with location_cols[1]:
-                st.write(f"**State FIPS:** {prop.get('stateFips', 'N/A')}")
-                st.write(f"**County FIPS:** {prop.get('countyFips', 'N/A')}")
-                st.write(f"**Assessor ID:** {prop.get('assessorID', 'N/A')}")
+                st.markdown(f"**State FIPS:** {prop.get('stateFips', 'N/A')}  \n"
+                            f"**County FIPS:** {prop.get('countyFips', 'N/A')}  \n"
+                            f"**Assessor ID:** {prop.get('assessorID', 'N/A')}")
         
         # Legal description
         if prop.get('legalDescription'):
@@ -261,8 +262,8 @@ with tab1:
     with col2:
         limit = st.selectbox("Results per page", [10, 25, 50, 100], index=1)
     with col3:
-        if st.button("🔄 Refresh", use_container_width=True):
-            st.rerun()
+        # The click itself reruns the page, which reloads the searches; the cached sidebar stats are dropped first
+        st.button("🔄 Refresh", use_container_width=True, on_click=clear_search_statistics, args=(user_id,))
     
     # Get user searches
     try:
@@ -304,8 +305,8 @@ with tab1:
                             st.metric("Properties", property_count)
                         
                         with col3:
-                            if st.button("👁️ View Details", key=f"view_{search_id}", use_container_width=True):
-                                st.session_state[f"show_details_{search_id}"] = not st.session_state.get(f"show_details_{search_id}", False)
+                            st.button("👁️ View Details", key=f"view_{search_id}", use_container_width=True,
+                                      on_click=toggle_state_flag, args=(f"show_details_{search_id}",))
                         
                         with col4:
                             if st.button("🗑️ Delete", key=f"delete_{search_id}", use_container_width=True, type="secondary"):
@@ -345,7 +346,7 @@ with tab1:
                                         
                                         with download_col1:
                                             # JSON download
-                                            json_data = json.dumps(property_data, indent=2)
+                                            json_data = orjson.dumps(property_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
                                             st.download_button(
                                                 label="📄 Download as JSON",
                                                 data=json_data,
@@ -591,7 +592,7 @@ with tab3:
     
     try:
         # Get all user searches for analytics
-        all_searches = get_user_searches(user_id, limit=1000)
+        all_searches = get_user_searches(user_id, limit=1000, columns="search_date, property_data")
         
         if all_searches and len(all_searches) > 0:
             # Create analytics dataframe
@@ -635,16 +636,18 @@ with tab3:
                 st.markdown("#### 💰 Price Range Analysis")
                 price_data = df[df['last_sale_price'].notna() & (df['last_sale_price'] > 0)]
                 if not price_data.empty:
+                    # All four summaries from one aggregation over the column
+                    price_stats = price_data['last_sale_price'].agg(['mean', 'median', 'min', 'max'])
                     price_cols = st.columns(3)
                     
                     with price_cols[0]:
-                        st.metric("Average Price", f"${int(price_data['last_sale_price'].mean()):,}")
+                        st.metric("Average Price", f"${int(price_stats['mean']):,}")
                     
                     with price_cols[1]:
-                        st.metric("Median Price", f"${int(price_data['last_sale_price'].median()):,}")
+                        st.metric("Median Price", f"${int(price_stats['median']):,}")
                     
                     with price_cols[2]:
-                        st.metric("Price Range", f"${int(price_data['last_sale_price'].min()):,} - ${int(price_data['last_sale_price'].max()):,}")
+                        st.metric("Price Range", f"${int(price_stats['min']):,} - ${int(price_stats['max']):,}")
                     
                     # Price distribution histogram
                     st.histogram(price_data['last_sale_price'], bins=20)
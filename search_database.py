@@ -1,5 +1,7 @@
+import heapq
 import json
 import os
+import orjson
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from supabase import Client
@@ -9,6 +11,22 @@ def get_supabase_client() -> Client:
     """Get Supabase client from session state"""
     return st.session_state.get("supabase")
 
+# Keyed on (path, mtime), so each write adds an entry; the bound evicts superseded versions
+LOCAL_JSON_CACHE_ENTRIES = 32
+
+@st.cache_data(max_entries=LOCAL_JSON_CACHE_ENTRIES, show_spinner=False)
+def _load_json_file(path: str, mtime: float) -> List[Dict[str, Any]]:
+    """Parse a local storage JSON file; keyed on mtime so writes invalidate the cache.
+
+    st.cache_data hands each caller its own copy, so callers may mutate the result.
+    """
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def load_local_json(path: str) -> List[Dict[str, Any]]:
+    """Load a local storage JSON file, reusing the parsed result across reruns"""
+    return _load_json_file(path, os.path.getmtime(path))
+
 def save_property_search(user_id: str, property_data: Dict[str, Any], search_params: Dict[str, Any] = None) -> Dict[str, Any]:
     """Save property search data to database"""
     try:
@@ -46,8 +64,8 @@ def save_search_locally(user_id: str, property_data: Dict[str, Any], search_para
         searches_file = os.path.join(storage_dir, f"searches_{user_id}.json")
         searches = []
         if os.path.exists(searches_file):
-            with open(searches_file, 'r') as f:
-                searches = json.load(f)
+            with open(searches_file, 'rb') as f:
+                searches = orjson.loads(f.read())
         
         # Add new search
         search_id = f"search_{len(searches) + 1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -93,12 +111,11 @@ def get_searches_locally(user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         searches_file = os.path.join(storage_dir, f"searches_{user_id}.json")
         
         if os.path.exists(searches_file):
-            with open(searches_file, 'r') as f:
-                searches = json.load(f)
+            searches = load_local_json(searches_file)
             
-            # Sort by created_at descending and limit
-            searches.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-            return searches[:limit]
+            # Newest `limit` searches by created_at, without sorting the whole file; older
+            # records may lack created_at, so they sort last instead of failing the whole load
+            return heapq.nlargest(limit, searches, key=lambda s: s.get("created_at", ""))
         else:
             return []
             
@@ -144,8 +161,8 @@ def delete_search_locally(search_id: str, user_id: str) -> Dict[str, Any]:
         searches_file = os.path.join(storage_dir, f"searches_{user_id}.json")
         
         if os.path.exists(searches_file):
-            with open(searches_file, 'r') as f:
-                searches = json.load(f)
+            with open(searches_file, 'rb') as f:
+                searches = orjson.loads(f.read())
             
             # Remove the search
             searches = [s for s in searches if s.get("id") != search_id]
@@ -208,8 +225,8 @@ def save_named_search_locally(user_id: str, search_name: str, search_criteria: D
         saved_file = os.path.join(storage_dir, f"saved_searches_{user_id}.json")
         saved_searches = []
         if os.path.exists(saved_file):
-            with open(saved_file, 'r') as f:
-                saved_searches = json.load(f)
+            with open(saved_file, 'rb') as f:
+                saved_searches = orjson.loads(f.read())
         
         search_record = {
             "id": f"saved_{len(saved_searches) + 1}",
@@ -252,8 +269,7 @@ def get_saved_searches_locally(user_id: str) -> List[Dict[str, Any]]:
         saved_file = os.path.join(storage_dir, f"saved_searches_{user_id}.json")
         
         if os.path.exists(saved_file):
-            with open(saved_file, 'r') as f:
-                return json.load(f)
+            return load_local_json(saved_file)
         else:
             return []
             
@@ -262,9 +278,14 @@ def get_saved_searches_locally(user_id: str) -> List[Dict[str, Any]]:
 
 # Initialize with sample data for demo
 def initialize_demo_data():
-    """Initialize demo data for testing"""
+    """Initialize demo data for testing (no-op once the demo user has data)"""
     demo_user_id = "demo-user-123"
     
+    # Only seed once per session, and never on top of existing demo searches in the active backend
+    if st.session_state.get("_demo_initialized") or get_user_searches(demo_user_id, limit=1):
+        st.session_state["_demo_initialized"] = True
+        return
+    
     # Sample property data from the uploaded JSON
     sample_property_data = {
         "address": "2397 dawn drive, Decatur, GA 30032",
@@ -352,11 +373,17 @@ def initialize_demo_data():
         "search_timestamp": "2025-08-28T03:19:46.214775"
     }
     
+    # Seed the same backend the guard above reads from (Supabase when connected, else local files)
+    if get_supabase_client():
+        save_search, save_named = save_property_search, save_named_search
+    else:
+        save_search, save_named = save_search_locally, save_named_search_locally
+    
     # Save sample search
-    save_search_locally(demo_user_id, sample_property_data, {"address": "2397 dawn drive, Decatur, GA 30032"})
+    save_search(demo_user_id, sample_property_data, {"address": "2397 dawn drive, Decatur, GA 30032"})
     
     # Save sample named search
-    save_named_search_locally(
+    save_named(
         demo_user_id,
         "Decatur Single Family Homes",
         {
@@ -368,4 +395,5 @@ def initialize_demo_data():
         },
         auto_notify=True
     )
+    st.session_state["_demo_initialized"] = True
 
@@ -13,13 +13,18 @@ def initialize_auth_state():
     if "access_token" not in st.session_state:
         st.session_state.access_token = None
 
+@st.cache_resource(max_entries=256, ttl=3600, show_spinner=False)
+def _get_client_for_token(access_token):
+    """Create a Supabase client for one access token; cached so its HTTP/2 connection is reused."""
+    client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    client.postgrest.auth(access_token)
+    return client
+
 def get_user_client():
     """Return Supabase client authorized with current user's access token."""
     if "access_token" not in st.session_state:
         return None
-    client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-    client.postgrest.auth(st.session_state.access_token)
-    return client
+    return _get_client_for_token(st.session_state.access_token)
 
 def login(email, password):
     """Handle user login with automatic provisioning if needed."""
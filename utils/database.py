@@ -10,7 +10,7 @@ def initialize_user_usage(user_id, email):
             "user_id": user_id,
             "email": email,
             "queries": 0
-        }).execute()
+        }, returning="minimal").execute()
 
 
 def get_user_usage(user_id, email):
@@ -19,7 +19,7 @@ def get_user_usage(user_id, email):
     if not client:
         return 0
 
-    response = client.table("api_usage").select("*").eq("user_id", user_id).execute()
+    response = client.table("api_usage").select("queries").eq("user_id", user_id).execute()
     if response.data:
         return response.data[0]["queries"]
     else:
@@ -28,6 +28,12 @@ def get_user_usage(user_id, email):
         return 0
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def get_cached_user_usage(user_id, email):
+    """Usage count for display only; quota checks must call get_user_usage directly."""
+    return get_user_usage(user_id, email)
+
+
 def increment_usage(user_id, email):
     """Increment API usage count for a user."""
     client = get_user_client()
@@ -37,7 +43,8 @@ def increment_usage(user_id, email):
     current = get_user_usage(user_id, email)
     client.table("api_usage").update({
         "queries": current + 1
-    }).eq("user_id", user_id).execute()
+    }, returning="minimal").eq("user_id", user_id).execute()
+    get_cached_user_usage.clear(user_id, email)
 
 
 def get_usage_history(user_id):
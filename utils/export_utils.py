@@ -1,8 +1,8 @@
-import json
+import csv
+import orjson
 import pandas as pd
 from datetime import datetime
 import io
-import base64
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -10,6 +10,17 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 
 
+# Column order for CSV exports
+CSV_FIELDS = (
+    "Address", "City", "State", "ZIP Code", "Property Type", "Bedrooms", "Bathrooms",
+    "Square Footage", "Lot Size", "Year Built", "Last Sale Price", "Last Sale Date",
+    "Owner Occupied", "Assessor ID", "County", "Zoning", "Owner Names", "Owner Type"
+)
+CSV_FEATURE_FIELDS = (
+    "Architecture Type", "Exterior Type", "Heating", "Cooling", "Garage", "Garage Spaces"
+)
+
+
 def export_to_json(search_data, search_id=None):
     """
     Export search data to JSON format.
@@ -22,7 +33,13 @@ def export_to_json(search_data, search_id=None):
         tuple: (json_string, filename)
     """
     try:
-        json_string = json.dumps(search_data, indent=2, default=str)
+        # PASSTHROUGH_DATETIME routes datetimes to default=str, keeping json.dumps's
+        # space-separated timestamps instead of orjson's native ISO 'T' format
+        json_string = orjson.dumps(
+            search_data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        ).decode()
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"property_search_{search_id or 'export'}_{timestamp}.json"
         return json_string, filename
@@ -46,7 +63,8 @@ def export_to_csv(search_results, search_id=None):
             raise Exception("No search results to export")
         
         # Extract property data
-        df_data = []
+        rows = []
+        has_features = False
         for prop in search_results:
             row = {
                 "Address": prop.get("formattedAddress", "N/A"),
@@ -79,6 +97,7 @@ def export_to_csv(search_results, search_id=None):
             
             # Add features if available
             if "features" in prop and prop["features"]:
+                has_features = True
                 features = prop["features"]
                 row["Architecture Type"] = features.get("architectureType", "N/A")
                 row["Exterior Type"] = features.get("exteriorType", "N/A")
@@ -87,10 +106,18 @@ def export_to_csv(search_results, search_id=None):
                 row["Garage"] = "Yes" if features.get("garage") else "No"
                 row["Garage Spaces"] = features.get("garageSpaces", "N/A")
             
-            df_data.append(row)
+            rows.append(row)
+        
+        # Feature columns only appear when at least one property has features
+        fieldnames = list(CSV_FIELDS)
+        if has_features:
+            fieldnames.extend(CSV_FEATURE_FIELDS)
         
-        df = pd.DataFrame(df_data)
-        csv_string = df.to_csv(index=False)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, restval="", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+        csv_string = buffer.getvalue()
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"property_search_{search_id or 'export'}_{timestamp}.csv"
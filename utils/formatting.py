@@ -0,0 +1,25 @@
+from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1024)
+def format_date(date_str):
+    """Format a date string (or datetime) for display.
+
+    Memoized here rather than in the pages: Streamlit re-executes page scripts
+    in a fresh module on every rerun, which would discard a page-level cache.
+    """
+    if not date_str:
+        return "N/A"
+    try:
+        if isinstance(date_str, str):
+            # Handle different date formats
+            if 'T' in date_str:
+                date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            else:
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+        else:
+            date_obj = date_str
+        return date_obj.strftime("%B %d, %Y at %I:%M %p")
+    except:
+        return str(date_str)
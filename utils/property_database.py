@@ -2,38 +2,142 @@
 # utils/property_database.py (Supabase only)
 # =====================================================
 
-from supabase import create_client, Client
-import json
+from supabase import create_client, Client, ClientOptions
+import atexit
+import orjson
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 import os
 
 logger = logging.getLogger(__name__)
 
+# One Supabase client per process, shared by every PropertySearchDatabase
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
+
+def _get_supabase() -> Client:
+    """Return the shared Supabase client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                url = os.getenv("SUPABASE_URL")
+                key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # use service role for insert/delete
+                _client = create_client(
+                    url, key,
+                    options=ClientOptions(postgrest_client_timeout=10, storage_client_timeout=10)
+                )
+    return _client
+
+# Rows per INSERT (or ids per DELETE) request for bulk operations
+BULK_CHUNK_SIZE = 500
+
+# Background writer used by save_property_search: queued rows are flushed
+# every WRITE_FLUSH_INTERVAL seconds or WRITE_BATCH_SIZE rows, whichever comes first
+WRITE_BATCH_SIZE = 50
+WRITE_FLUSH_INTERVAL = 0.2
+# A failed batch is retried this many times (backing off 1s, 2s, ...) before it is dropped
+WRITE_RETRIES = 3
+# How long the interpreter-exit flush waits for queued searches
+WRITE_EXIT_TIMEOUT = 10.0
+_write_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_writer_thread: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+def _build_search_record(user_id: str, property_data: Dict[Any, Any], consumer_secret: str = None,
+                         search_date: str = None) -> Dict[str, Any]:
+    """Build a property_searches row"""
+    return {
+        "user_id": user_id,
+        "property_data": property_data,
+        "search_date": search_date or datetime.utcnow().isoformat(),
+        "consumer_secret": consumer_secret
+    }
+
+def _write_batch(db: Optional["PropertySearchDatabase"], batch: List[Dict[str, Any]]) -> Optional["PropertySearchDatabase"]:
+    """Insert one batch, retrying client creation and unsaved rows before giving up on them.
+
+    Returns the client so the writer can reuse it (None if it could not be created).
+    """
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            # The client is created here so a bad URL/key gets the same retries as a failed insert
+            if db is None:
+                db = PropertySearchDatabase()
+            batch = batch[db.insert_records(batch):]
+        except Exception as e:
+            logger.error(f"Error writing queued property searches: {e}")
+        if not batch:
+            return db
+        if attempt < WRITE_RETRIES:
+            time.sleep(2 ** attempt)
+    logger.error(f"Dropped {len(batch)} queued property search(es) after {WRITE_RETRIES} retries")
+    return db
+
+def _writer_loop():
+    """Drain the write queue in batches, forever (runs on a daemon thread)"""
+    db = None
+    while True:
+        batch = [_write_queue.get()]
+        deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+        while len(batch) < WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            db = _write_batch(db, batch)
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+def _ensure_writer():
+    """Start the background writer thread on first use, or restart it if it has died"""
+    global _writer_thread
+    if _writer_thread is None or not _writer_thread.is_alive():
+        with _writer_lock:
+            if _writer_thread is None or not _writer_thread.is_alive():
+                _writer_thread = threading.Thread(target=_writer_loop, name="property-search-writer", daemon=True)
+                _writer_thread.start()
+
 class PropertySearchDatabase:
     """Database operations for property search history (Supabase REST only)"""
     
     def __init__(self):
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # use service role for insert/delete
-        self.supabase: Client = create_client(url, key)
+        self.supabase: Client = _get_supabase()
 
     def save_search(self, user_id: str, property_data: Dict[Any, Any], consumer_secret: str = None) -> bool:
         """Save property search to Supabase"""
+        return self.save_searches_bulk(user_id, [property_data], consumer_secret) == 1
+
+    def save_searches_bulk(self, user_id: str, properties: List[Dict[Any, Any]], consumer_secret: str = None) -> int:
+        """Save several property searches with one INSERT per 500 rows; returns rows saved"""
+        search_date = datetime.utcnow().isoformat()
+        return self.insert_records([
+            _build_search_record(user_id, property_data, consumer_secret, search_date)
+            for property_data in properties
+        ])
+
+    def insert_records(self, records: List[Dict[str, Any]]) -> int:
+        """Insert prepared property_searches rows, 500 per request; returns rows saved"""
+        saved = 0
         try:
-            data = {
-                "user_id": user_id,
-                "property_data": property_data,
-                "search_date": datetime.utcnow().isoformat(),
-                "consumer_secret": consumer_secret
-            }
-            self.supabase.table("property_searches").insert(data).execute()
-            logger.info(f"Property search saved for user {user_id}")
-            return True
+            for i in range(0, len(records), BULK_CHUNK_SIZE):
+                chunk = records[i:i + BULK_CHUNK_SIZE]
+                self.supabase.table("property_searches").insert(chunk, returning="minimal").execute()
+                saved += len(chunk)
+            logger.info(f"{saved} property search(es) saved")
         except Exception as e:
             logger.error(f"Error saving property search: {e}")
-            return False
+        return saved
     
     def get_user_searches(self, user_id: str, limit: int = 50, offset: int = 0) -> List[Dict]:
         """Get user's property search history with pagination"""
@@ -53,23 +157,36 @@ class PropertySearchDatabase:
     
     def delete_search(self, search_id: int, user_id: str) -> bool:
         """Delete a specific property search"""
-        try:
+        return self.delete_searches([search_id], user_id) > 0
+
+    def delete_searches(self, search_ids: List[int], user_id: str) -> int:
+        """Delete several property searches in concurrent chunks of ids; returns rows deleted"""
+        def delete_chunk(chunk: List[int]) -> int:
             response = (
                 self.supabase.table("property_searches")
-                .delete()
-                .eq("id", search_id)
+                .delete(count="exact", returning="minimal")
                 .eq("user_id", user_id)
+                .in_("id", chunk)
                 .execute()
             )
-            return response.count > 0
-        except Exception as e:
-            logger.error(f"Error deleting property search: {e}")
-            return False
+            return response.count or 0
+
+        chunks = [search_ids[i:i + BULK_CHUNK_SIZE] for i in range(0, len(search_ids), BULK_CHUNK_SIZE)]
+        deleted = 0
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {executor.submit(delete_chunk, chunk): chunk for chunk in chunks}
+            # Each chunk succeeds or fails on its own, so one failure neither hides the others nor the count
+            for future in as_completed(futures):
+                try:
+                    deleted += future.result()
+                except Exception as e:
+                    logger.error(f"Error deleting {len(futures[future])} property search(es): {e}")
+        return deleted
     
     def delete_all_user_searches(self, user_id: str) -> bool:
         """Delete all searches for a user"""
         try:
-            self.supabase.table("property_searches").delete().eq("user_id", user_id).execute()
+            self.supabase.table("property_searches").delete(returning="minimal").eq("user_id", user_id).execute()
             logger.info(f"All searches deleted for user {user_id}")
             return True
         except Exception as e:
@@ -81,14 +198,14 @@ class PropertySearchDatabase:
         stats = {}
         try:
             # Total searches
-            resp = self.supabase.table("property_searches").select("id", count="exact").eq("user_id", user_id).execute()
+            resp = self.supabase.table("property_searches").select("id", count="exact", head=True).eq("user_id", user_id).execute()
             stats["total_searches"] = resp.count or 0
 
             # Recent searches (last 30 days)
             thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat()
             resp = (
                 self.supabase.table("property_searches")
-                .select("id", count="exact")
+                .select("id", count="exact", head=True)
                 .eq("user_id", user_id)
                 .gte("search_date", thirty_days_ago)
                 .execute()
@@ -99,7 +216,7 @@ class PropertySearchDatabase:
             week_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
             resp = (
                 self.supabase.table("property_searches")
-                .select("id", count="exact")
+                .select("id", count="exact", head=True)
                 .eq("user_id", user_id)
                 .gte("search_date", week_ago)
                 .execute()
@@ -111,19 +228,36 @@ class PropertySearchDatabase:
             logger.error(f"Error getting search statistics: {e}")
             return {}
     
-    def export_user_searches(self, user_id: str, format: str = "json") -> Optional[str]:
-        """Export all user searches"""
-        try:
-            response = (
+    def iter_user_searches(self, user_id: str, page_size: int = 1000) -> Iterator[Dict]:
+        """Yield every search for a user, paging by id (keyset) rather than OFFSET"""
+        last_id = None
+        while True:
+            query = (
                 self.supabase.table("property_searches")
                 .select("*")
                 .eq("user_id", user_id)
-                .limit(1000)
-                .execute()
+                .order("id")
+                .limit(page_size)
             )
-            searches = response.data or []
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.execute().data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def export_user_searches(self, user_id: str, format: str = "json") -> Optional[str]:
+        """Export all user searches"""
+        try:
             if format.lower() == "json":
-                return json.dumps(searches, indent=2, default=str)
+                searches = list(self.iter_user_searches(user_id))
+                # Datetimes go through default=str, matching the old json.dumps output
+                return orjson.dumps(
+                    searches,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+                ).decode()
             return None
         except Exception as e:
             logger.error(f"Error exporting user searches: {e}")
@@ -132,7 +266,25 @@ class PropertySearchDatabase:
 
 # Convenience functions
 def save_property_search(user_id: str, property_data: Dict[Any, Any], consumer_secret: str = None) -> bool:
-    return PropertySearchDatabase().save_search(user_id, property_data, consumer_secret)
+    """Queue a search for the background writer and return immediately"""
+    _ensure_writer()
+    _write_queue.put(_build_search_record(user_id, property_data, consumer_secret))
+    return True
+
+def flush_property_searches(timeout: Optional[float] = None) -> bool:
+    """Wait until every queued search has been written; returns False if the timeout ran out first"""
+    with _write_queue.all_tasks_done:
+        if not _write_queue.unfinished_tasks:
+            return True
+    _ensure_writer()
+    with _write_queue.all_tasks_done:
+        return _write_queue.all_tasks_done.wait_for(lambda: not _write_queue.unfinished_tasks, timeout)
+
+# Daemon threads are killed at exit, so give queued searches a bounded chance to land first
+atexit.register(flush_property_searches, WRITE_EXIT_TIMEOUT)
+
+def save_property_searches_bulk(user_id: str, properties: List[Dict[Any, Any]], consumer_secret: str = None) -> int:
+    return PropertySearchDatabase().save_searches_bulk(user_id, properties, consumer_secret)
 
 def get_user_property_searches(user_id: str, limit: int = 50) -> List[Dict]:
     return PropertySearchDatabase().get_user_searches(user_id, limit)
@@ -140,5 +292,8 @@ def get_user_property_searches(user_id: str, limit: int = 50) -> List[Dict]:
 def delete_property_search(search_id: int, user_id: str) -> bool:
     return PropertySearchDatabase().delete_search(search_id, user_id)
 
+def delete_property_searches(search_ids: List[int], user_id: str) -> int:
+    return PropertySearchDatabase().delete_searches(search_ids, user_id)
+
 def get_search_statistics(user_id: str) -> Dict[str, Any]:
     return PropertySearchDatabase().get_search_statistics(user_id)
@@ -37,6 +37,7 @@ def save_property_search(user_id, address, search_results, search_params=None):
         response = client.table("property_searches").insert(search_data).execute()
         
         if response.data:
+            clear_search_statistics(user_id)
             return {
                 "success": True, 
                 "search_id": response.data[0]["id"],
@@ -49,7 +50,7 @@ def save_property_search(user_id, address, search_results, search_params=None):
         return {"success": False, "message": f"Error saving search: {str(e)}"}
 
 
-def get_user_searches(user_id, limit=50, offset=0):
+def get_user_searches(user_id, limit=50, offset=0, columns="*"):
     """
     Retrieve user's saved searches from Supabase.
     
@@ -57,6 +58,7 @@ def get_user_searches(user_id, limit=50, offset=0):
         user_id: User ID (UUID)
         limit: Maximum number of searches to return
         offset: Number of searches to skip (for pagination)
+        columns: Comma-separated columns to fetch (defaults to all)
     
     Returns:
         list: List of saved searches
@@ -67,7 +69,7 @@ def get_user_searches(user_id, limit=50, offset=0):
     
     try:
         response = client.table("property_searches")\
-            .select("*")\
+            .select(columns)\
             .eq("user_id", str(user_id))\
             .order("search_date", desc=True)\
             .limit(limit)\
@@ -81,6 +83,31 @@ def get_user_searches(user_id, limit=50, offset=0):
         return []
 
 
+def count_user_searches(user_id):
+    """
+    Count a user's property searches without fetching any rows.
+    
+    Args:
+        user_id: User ID (UUID)
+    
+    Returns:
+        int: Number of searches
+    
+    Raises:
+        Exception: if the count query fails, so callers can tell a failure from zero searches
+    """
+    client = get_user_client()
+    if not client:
+        return 0
+    
+    response = client.table("property_searches")\
+        .select("id", count="exact", head=True)\
+        .eq("user_id", str(user_id))\
+        .execute()
+    
+    return response.count or 0
+
+
 def get_search_by_id(search_id, user_id):
     """
     Get a specific search by ID (with user verification).
@@ -127,11 +154,12 @@ def delete_search(search_id, user_id):
     
     try:
         response = client.table("property_searches")\
-            .delete()\
+            .delete(returning="minimal")\
             .eq("id", search_id)\
             .eq("user_id", str(user_id))\
             .execute()
         
+        clear_search_statistics(user_id)
         return {"success": True, "message": "Search deleted successfully"}
         
     except Exception as e:
@@ -167,6 +195,7 @@ def save_named_search(user_id, search_name, search_criteria, auto_notify=False):
         response = client.table("saved_searches").insert(search_data).execute()
         
         if response.data:
+            clear_search_statistics(user_id)
             return {
                 "success": True,
                 "saved_search_id": response.data[0]["id"],
@@ -227,7 +256,7 @@ def update_saved_search_results(saved_search_id, results_count):
             .update({
                 "results_count": results_count,
                 "last_run": datetime.now().isoformat()
-            })\
+            }, returning="minimal")\
             .eq("id", saved_search_id)\
             .execute()
         
@@ -237,39 +266,54 @@ def update_saved_search_results(saved_search_id, results_count):
         return {"success": False, "message": f"Error updating search: {str(e)}"}
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_search_statistics(user_id):
+    """Count the user's searches; errors propagate so a failed lookup is never cached."""
+    client = get_user_client()
+    
+    # Get total property searches
+    total_response = client.table("property_searches")\
+        .select("id", count="exact", head=True)\
+        .eq("user_id", str(user_id))\
+        .execute()
+    
+    # Get saved searches count
+    saved_response = client.table("saved_searches")\
+        .select("id", count="exact", head=True)\
+        .eq("user_id", int(user_id))\
+        .execute()
+    
+    return {
+        "total_searches": total_response.count or 0,
+        "saved_searches": saved_response.count or 0
+    }
+
+
 def get_search_statistics(user_id):
     """
     Get search statistics for the user.
     
+    Cached per user for 60 seconds because the sidebars call it on every rerun;
+    the save/delete helpers in this module clear the user's entry. The zeroed
+    fallbacks below are returned uncached, so the next rerun retries.
+    
     Args:
         user_id: User ID
     
     Returns:
         dict: Search statistics
     """
-    client = get_user_client()
-    if not client:
+    if not get_user_client():
         return {"total_searches": 0, "saved_searches": 0}
     
     try:
-        # Get total property searches
-        total_response = client.table("property_searches")\
-            .select("id", count="exact")\
-            .eq("user_id", str(user_id))\
-            .execute()
-        
-        # Get saved searches count
-        saved_response = client.table("saved_searches")\
-            .select("id", count="exact")\
-            .eq("user_id", int(user_id))\
-            .execute()
-        
-        return {
-            "total_searches": total_response.count or 0,
-            "saved_searches": saved_response.count or 0
-        }
-        
+        return _cached_search_statistics(user_id)
     except Exception as e:
         st.error(f"Error getting statistics: {str(e)}")
         return {"total_searches": 0, "saved_searches": 0}
 
+
+def clear_search_statistics(user_id):
+    """Drop the user's cached statistics (after a save or delete, or on Refresh)."""
+    _cached_search_statistics.clear(user_id)
+
@@ -2,6 +2,11 @@ import requests
 import streamlit as st
 from datetime import datetime
 import base64
+import secrets
+import string
+
+# Characters used for generated WordPress passwords
+PASSWORD_ALPHABET = string.ascii_letters + string.digits
 
 class WordPressAPI:
     def __init__(self):
@@ -47,9 +52,7 @@ class WordPressAPI:
         try:
             # Generate a random password if not provided
             if not password:
-                import secrets
-                import string
-                password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
+                password = ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(12))
             
             user_data = {
                 'username': email.split('@')[0],  # Use email prefix as username